@@ -7,8 +7,10 @@ from airport.models import (
     Crew,
     Facility,
     Flight,
+    FlightSchedule,
     Order,
     Route,
+    SeatHold,
     Ticket,
 )
 
@@ -24,6 +26,8 @@ admin.site.register(Airplane)
 admin.site.register(Crew)
 admin.site.register(Facility)
 admin.site.register(Flight)
+admin.site.register(FlightSchedule)
 admin.site.register(Order)
 admin.site.register(Route)
+admin.site.register(SeatHold)
 admin.site.register(Ticket)
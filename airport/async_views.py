@@ -0,0 +1,155 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.http.response import HttpResponseBase
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from airport.models import Flight, Route, Ticket
+from airport.pagination import FlightPagination
+from airport.serializers import (
+    FlightDetailSerializer,
+    FlightListSerializer,
+    FlightSeatMapSerializer,
+    RouteListSerializer,
+)
+
+
+class AsyncAPIView(View):
+    """
+    Read-only endpoint running on the event loop when served by ASGI.
+
+    Authentication goes through the same DRF authentication classes as
+    the viewsets and rows are fetched with the async ORM API, so a
+    slow client never holds a worker thread. Handlers return data,
+    which is rendered as JSON.
+    """
+
+    queryset = None
+    serializer_class = None
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["context"] = {"request": self.request, "view": self}
+        return self.serializer_class(*args, **kwargs)
+
+    @staticmethod
+    def check_authenticated(request):
+        if not request.user or not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = request = Request(
+            request,
+            authenticators=[
+                authentication_class()
+                for authentication_class in (
+                    api_settings.DEFAULT_AUTHENTICATION_CLASSES
+                )
+            ],
+        )
+
+        try:
+            await sync_to_async(self.check_authenticated)(request)
+            data = await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+
+        if isinstance(data, HttpResponseBase):
+            return data
+        return JsonResponse(data, safe=False)
+
+    @staticmethod
+    def handle_exception(request, exc):
+        response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            authenticate_header = None
+            if request.authenticators:
+                authenticate_header = request.authenticators[
+                    0
+                ].authenticate_header(request)
+
+            if authenticate_header:
+                response["WWW-Authenticate"] = authenticate_header
+            else:
+                response.status_code = exceptions.PermissionDenied.status_code
+
+        return response
+
+
+class AsyncListView(AsyncAPIView):
+    pagination_class = None
+
+    async def get(self, request):
+        queryset = self.get_queryset()
+
+        if self.pagination_class is None:
+            objects = [obj async for obj in queryset]
+            return self.get_serializer(objects, many=True).data
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data).data
+
+
+class AsyncRetrieveView(AsyncAPIView):
+    async def get_object(self, pk):
+        try:
+            return await self.get_queryset().aget(pk=pk)
+        except ObjectDoesNotExist:
+            raise exceptions.NotFound()
+
+    async def get(self, request, pk):
+        obj = await self.get_object(pk)
+        return self.get_serializer(obj).data
+
+
+class FlightListView(AsyncListView):
+    queryset = Flight.objects.select_related("airplane", "route__destination")
+    serializer_class = FlightListSerializer
+    pagination_class = FlightPagination
+
+
+class FlightDetailView(AsyncRetrieveView):
+    queryset = Flight.objects.select_related(
+        "route__source",
+        "route__destination",
+        "airplane__airplane_type",
+    ).prefetch_related(
+        "airplane__facilities",
+        "airplane__crew",
+        # taken seats are read from the prefetch instead of a query
+        # per flight, which could not run on the event loop
+        Prefetch(
+            "tickets", queryset=Ticket.objects.only("row", "seat", "flight")
+        ),
+    )
+    serializer_class = FlightDetailSerializer
+
+
+class FlightSeatMapView(AsyncRetrieveView):
+    queryset = Flight.objects.select_related("airplane")
+    serializer_class = FlightSeatMapSerializer
+
+    async def get_object(self, pk):
+        flight = await super().get_object(pk)
+        if len(flight.seat_map) != flight.airplane.seat_map_size:
+            # rebuilding a stale map reads the tickets, which cannot
+            # run on the event loop
+            flight.seat_map = await sync_to_async(flight.get_seat_map)()
+        return flight
+
+
+class RouteListView(AsyncListView):
+    queryset = Route.objects.select_related("source", "destination")
+    serializer_class = RouteListSerializer
@@ -0,0 +1,310 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict, namedtuple
+
+from airport.cache import get_model_versions
+from airport.models import Airport
+
+Match = namedtuple("Match", ("id", "name", "closest_big_city", "country"))
+
+# how much a word matched in each field counts towards the score
+FIELD_WEIGHTS = {"country": 1, "closest_big_city": 2, "name": 3}
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Casefold ``text`` and strip its accents: "São Paulo" -> "sao paulo"."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return WORD.findall(normalize(text))
+
+
+def trigrams(word):
+    """
+    Trigrams of ``word`` anchored at its start, with their positions,
+    so the trigrams of a prefix are a subset of those of every word it
+    begins.
+    """
+    word = f"${word}"
+    return [
+        (index, word[index : index + 3])
+        for index in range(max(len(word) - 2, 1))
+    ]
+
+
+def max_typos(word):
+    if len(word) < 3:
+        return 0
+    if len(word) < 6:
+        return 1
+    return 2
+
+
+def prefix_distance(word, token, limit):
+    """
+    Edit distance between ``word`` and the closest prefix of ``token``,
+    or ``limit + 1`` once it is known to exceed ``limit``.
+    """
+    previous = list(range(len(token) + 1))
+    for row, char in enumerate(word, 1):
+        current = [row]
+        closest = row
+        for column, other in enumerate(token, 1):
+            distance = previous[column - 1] + (char != other)
+            if previous[column] < distance:
+                distance = previous[column] + 1
+            if current[-1] < distance:
+                distance = current[-1] + 1
+            current.append(distance)
+            if distance < closest:
+                closest = distance
+        if closest > limit:
+            return limit + 1
+        previous = current
+    return min(previous)
+
+
+class AirportIndex:
+    """
+    Typeahead index of airports by name, closest big city and country.
+
+    Words are normalized and kept in a sorted list, so the words a
+    prefix begins are a contiguous slice found by bisection, and a
+    running count of their airports tells how selective the prefix is
+    without visiting them. A search starts from the airports of the
+    most selective word of the query and checks the other words
+    against the words of those airports only. A trigram index over
+    the words finds the ones a misspelled prefix is close to when the
+    prefix alone matches too few airports. The ranking of prefixes
+    that match many airports is kept until the index is rebuilt.
+
+    The index is built from the database on first use and rebuilt
+    whenever the version of ``Airport`` in the response cache, which
+    model signals bump on every save and delete, differs from the one
+    it was built at, so every process sees changes made by the others.
+    ``invalidate`` drops it, which is what bulk writes that skip model
+    signals should call.
+    """
+
+    # prefixes matching at least this many airports keep their ranking
+    broad_prefix_size = 200
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._airports = {}
+            self._airport_words = {}
+            self._postings = {}
+            self._words = []
+            self._offsets = [0]
+            self._trigrams = []
+            self._rankings = {}
+
+    def _ensure_loaded(self):
+        (version,) = get_model_versions((Airport,))
+        if version == self._version:
+            return
+
+        self.invalidate()
+        postings = defaultdict(dict)
+        # cities and countries repeat, so tokenize each value once
+        field_words = {}
+        # the index is kept under the version bumped by writes to the
+        # primary, so it must not be loaded from a lagging replica
+        for airport in (
+            Airport.objects.using("default")
+            .values_list(*Match._fields)
+            .order_by()
+        ):
+            airport = Match._make(airport)
+            words = {}
+            # lowest weight first, so a word keeps its best field
+            for field, weight in FIELD_WEIGHTS.items():
+                value = getattr(airport, field)
+                if value not in field_words:
+                    field_words[value] = tokenize(value)
+                for word in field_words[value]:
+                    words[word] = weight
+            for word, weight in words.items():
+                postings[word][airport.id] = weight
+            self._airports[airport.id] = airport
+            self._airport_words[airport.id] = tuple(words.items())
+
+        self._postings = dict(postings)
+        self._words = sorted(postings)
+        for word in self._words:
+            self._offsets.append(self._offsets[-1] + len(postings[word]))
+            for position, trigram in trigrams(word):
+                if position == len(self._trigrams):
+                    self._trigrams.append(defaultdict(list))
+                self._trigrams[position][trigram].append(word)
+        self._version = version
+
+    def _word_range(self, prefix):
+        return (
+            bisect_left(self._words, prefix),
+            bisect_left(self._words, prefix + "\U0010ffff"),
+        )
+
+    def _size(self, prefix):
+        """How many airports ``prefix`` matches, counted once per word."""
+        start, stop = self._word_range(prefix)
+        return self._offsets[stop] - self._offsets[start]
+
+    def _similar_words(self, prefix, size):
+        """
+        Words beginning within ``max_typos`` edits of ``prefix``, most
+        trigrams in common first, until they match ``size`` airports.
+        """
+        limit = max_typos(prefix)
+        if not limit:
+            return
+
+        # each edit shifts the trigrams after it by one position at most
+        prefix_trigrams = trigrams(prefix)
+        shared = Counter()
+        for index, trigram in prefix_trigrams:
+            for grams in self._trigrams[
+                max(index - limit, 0) : index + limit + 1
+            ]:
+                shared.update(grams.get(trigram, ()))
+
+        # an edit changes at most three trigrams
+        required = len(prefix_trigrams) - 3 * limit
+        for word, count in shared.most_common():
+            if count < required or size <= 0:
+                return
+            if word.startswith(prefix):
+                continue
+            distance = prefix_distance(
+                prefix, word[: len(prefix) + limit], limit
+            )
+            if distance <= limit:
+                size -= len(self._postings[word])
+                yield word
+
+    def _match(self, prefix, limit):
+        """Score of every airport with a word that ``prefix`` matches."""
+        scores = {}
+
+        def add(word, quality):
+            for airport_id, weight in self._postings[word].items():
+                score = quality * weight
+                if scores.get(airport_id, 0) < score:
+                    scores[airport_id] = score
+
+        start, stop = self._word_range(prefix)
+        for word in self._words[start:stop]:
+            add(word, 3 if word == prefix else 2)
+
+        if len(scores) < limit:
+            for word in self._similar_words(prefix, limit - len(scores)):
+                add(word, 1)
+
+        return scores
+
+    def _filter(self, scores, prefix, limit):
+        """
+        Add the score of ``prefix`` to the airports of ``scores`` with a
+        word it matches, dropping the others.
+        """
+        matched = {}
+        for airport_id, score in scores.items():
+            quality = 0
+            for word, weight in self._airport_words[airport_id]:
+                if word.startswith(prefix):
+                    quality = max(
+                        quality, (3 if word == prefix else 2) * weight
+                    )
+            if quality:
+                matched[airport_id] = score + quality
+
+        typos = max_typos(prefix)
+        if len(matched) < limit and typos:
+            for airport_id, score in scores.items():
+                if airport_id in matched:
+                    continue
+                quality = max(
+                    (
+                        weight
+                        for word, weight in self._airport_words[airport_id]
+                        if prefix_distance(
+                            prefix, word[: len(prefix) + typos], typos
+                        )
+                        <= typos
+                    ),
+                    default=0,
+                )
+                if quality:
+                    matched[airport_id] = score + quality
+
+        return matched
+
+    def _rank(self, scores, limit):
+        airports = self._airports
+        return [
+            airports[airport_id]
+            for airport_id in heapq.nsmallest(
+                limit,
+                scores,
+                key=lambda airport_id: (
+                    -scores[airport_id],
+                    len(airports[airport_id].name),
+                    airports[airport_id].name,
+                    airport_id,
+                ),
+            )
+        ]
+
+    def search(self, query, limit=10):
+        """
+        Return up to ``limit`` airports matching every word of
+        ``query`` by prefix, allowing a typo or two in longer words.
+
+        An exact word scores above a prefix, which scores above a
+        misspelling, and a match in the name above one in the city or
+        country; ties go to the shorter name.
+        """
+        prefixes = tokenize(query)
+        if not prefixes:
+            return []
+
+        with self._lock:
+            self._ensure_loaded()
+
+            prefixes.sort(key=self._size)
+            first = prefixes[0]
+            ranked = len(prefixes) == 1 and limit <= self.broad_prefix_size
+            if ranked and first in self._rankings:
+                return self._rankings[first][:limit]
+
+            scores = self._match(first, limit)
+            if ranked and len(scores) >= self.broad_prefix_size:
+                self._rankings[first] = self._rank(
+                    scores, self.broad_prefix_size
+                )
+                return self._rankings[first][:limit]
+
+            for prefix in prefixes[1:]:
+                if not scores:
+                    break
+                scores = self._filter(scores, prefix, limit)
+
+            return self._rank(scores, limit)
+
+
+airport_index = AirportIndex()
@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from airport_api.db_routers import read_from_primary
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f"airport:response-version:{model._meta.label_lower}"
+
+
+def get_model_versions(models):
+    """
+    Return the last change time of every model, as recorded in the
+    cache. Unknown models are stamped now, which is newer than any
+    response cached for them before.
+    """
+    cache = get_response_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+
+    return [versions.get(key, time.time()) for key in keys]
+
+
+def invalidate_response_cache(model):
+    """
+    Bump the model version right away, so a change is never served
+    stale inside its own transaction, and again after commit, so a
+    response cached by a concurrent request before commit is dropped.
+    """
+
+    def bump():
+        get_response_cache().set(
+            _version_key(model), time.time(), timeout=None
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+    """
+    Cache list and retrieve responses of a viewset.
+
+    Responses are keyed by scheme, host, path, query string, renderer
+    and the versions of ``cache_models``, which model signals bump on
+    every save and delete (see ``airport.signals``). The ETag and
+    Last-Modified headers derive from the same versions, so
+    conditional requests are answered with 304 without touching the
+    database or the serializers.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        versions = get_model_versions(
+            self.cache_models or (self.queryset.model,)
+        )
+        last_modified = int(max(versions))
+        digest = hashlib.md5(
+            "|".join(
+                [
+                    # serializers build absolute URLs, e.g. of images
+                    request.build_absolute_uri("/"),
+                    request.get_full_path(),
+                    request.accepted_renderer.format,
+                    *map(repr, versions),
+                ]
+            ).encode()
+        ).hexdigest()
+        headers = {
+            "ETag": f'"{digest}"',
+            "Last-Modified": http_date(last_modified),
+        }
+
+        conditional_response = get_conditional_response(
+            request,
+            etag=headers["ETag"],
+            last_modified=last_modified,
+            response=HttpResponse(headers=headers),
+        )
+        if conditional_response.status_code != 200:
+            return conditional_response
+
+        cache = get_response_cache()
+        cache_key = f"airport:response:{digest}"
+        data = cache.get(cache_key)
+        if data is not None:
+            response = Response(data)
+        else:
+            # the data is cached under versions bumped by writes to
+            # the primary, so it must not come from a lagging replica
+            with read_from_primary():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cache.set(
+                cache_key, response.data, settings.RESPONSE_CACHE_TIMEOUT
+            )
+
+        for header, value in headers.items():
+            response[header] = value
+        return response
@@ -0,0 +1,249 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from math import inf
+
+from django.utils import timezone
+
+from airport.cache import get_model_versions
+from airport.models import Flight, Route
+
+Leg = namedtuple(
+    "Leg",
+    (
+        "flight_id",
+        "route_id",
+        "source_id",
+        "destination_id",
+        "departure_time",
+        "arrival_time",
+        "distance",
+    ),
+)
+
+CRITERIA = {
+    "earliest": lambda arrival, legs, distance: (arrival, legs, distance),
+    "fewest_legs": lambda arrival, legs, distance: (legs, arrival, distance),
+    "shortest": lambda arrival, legs, distance: (distance, arrival, legs),
+}
+
+
+class ConnectionGraph:
+    """
+    Time-dependent graph of flights between airports.
+
+    Each airport keeps its outgoing flights sorted by departure time.
+    The graph is loaded from the database on first use, from ``history``
+    ago on, and refreshed whenever the versions of ``Flight`` and
+    ``Route`` in the response cache, which model signals and bulk
+    writes of flights bump (see ``airport.signals``), differ from the
+    ones it was loaded at, so every process sees changes made by the
+    others. A new flight version only reloads the flights updated since
+    the previous refresh; a new route version reloads everything.
+    Deleted flights stay in the graph until the next full reload,
+    which ``invalidate`` forces, e.g. once a search returns one.
+    """
+
+    # flights that left longer ago are of no use to new itineraries
+    history = timedelta(days=1)
+    # flights are stamped when saved, not when committed, so a refresh
+    # also looks at flights updated this long before the previous one
+    refresh_overlap = timedelta(minutes=5)
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._versions = None
+            self._loaded_at = None
+            self._routes = {}
+            self._legs = {}
+            self._departures = defaultdict(list)
+
+    def _ensure_loaded(self):
+        versions = get_model_versions((Flight, Route))
+        if versions == self._versions:
+            return
+
+        loaded_at = timezone.now()
+        # the graph is kept under versions bumped by writes to the
+        # primary, so it must not be loaded from a lagging replica
+        flights = Flight.objects.using("default").values_list(
+            "id", "route_id", "departure_time", "arrival_time"
+        )
+        if self._versions is not None and self._versions[1] == versions[1]:
+            # only flights changed, apply the ones updated since
+            flights = flights.filter(
+                updated_at__gte=self._loaded_at - self.refresh_overlap
+            ).order_by()
+        else:
+            self._load_routes()
+            flights = flights.filter(
+                departure_time__gte=loaded_at - self.history
+            ).order_by("departure_time", "id")
+
+        for flight in flights:
+            self._remove_leg(flight[0])
+            self._add_leg(*flight)
+        self._versions = versions
+        self._loaded_at = loaded_at
+
+    def _load_routes(self):
+        self.invalidate()
+        for (
+            route_id,
+            source_id,
+            destination_id,
+            distance,
+        ) in (
+            Route.objects.using("default")
+            .values_list("id", "source_id", "destination_id", "distance")
+            .order_by()
+        ):
+            self._routes[route_id] = (source_id, destination_id, distance)
+
+    def _add_leg(self, flight_id, route_id, departure_time, arrival_time):
+        if route_id not in self._routes:
+            return
+
+        source_id, destination_id, distance = self._routes[route_id]
+        leg = Leg(
+            flight_id,
+            route_id,
+            source_id,
+            destination_id,
+            departure_time,
+            arrival_time,
+            distance,
+        )
+        self._legs[flight_id] = leg
+        # appends when flights come in departure order, as on a load
+        insort(self._departures[source_id], (departure_time, flight_id))
+
+    def _remove_leg(self, flight_id):
+        leg = self._legs.pop(flight_id, None)
+        if leg is None:
+            return
+
+        departures = self._departures[leg.source_id]
+        del departures[
+            bisect_left(departures, (leg.departure_time, flight_id))
+        ]
+
+    def _dominates(self, airport_id, label, other, max_connection):
+        """
+        Whether ``label`` reaching ``airport_id`` is at least as good as
+        ``other`` there: not later, with no more legs and distance, and
+        with no flight out of the airport that only ``other`` is still
+        in time for.
+        """
+        if not all(old <= new for old, new in zip(label, other)):
+            return False
+        if max_connection is None:
+            return True
+
+        departures = self._departures[airport_id]
+        index = bisect_right(departures, (label[0] + max_connection, inf))
+        return (
+            index == len(departures)
+            or departures[index][0] > other[0] + max_connection
+        )
+
+    def search(
+        self,
+        source_id,
+        destination_id,
+        departure_time,
+        criterion="earliest",
+        min_connection=timedelta(minutes=45),
+        max_connection=timedelta(hours=24),
+        max_legs=3,
+    ):
+        """
+        Return the flight ids of the best itinerary or ``None``.
+
+        The first flight leaves at or after ``departure_time``; every
+        next one leaves between ``min_connection`` and ``max_connection``
+        after the previous arrival. Labels are Pareto-pruned on
+        (arrival, legs, distance), all of which only grow along a path,
+        so the first itinerary reaching the destination is optimal for
+        ``criterion``. A later arrival is only pruned when no flight it
+        could still connect to is out of reach of the earlier one.
+        """
+        key = CRITERIA[criterion]
+
+        with self._lock:
+            self._ensure_loaded()
+
+            heap = [
+                (key(departure_time, 0, 0), 0, source_id, departure_time, ())
+            ]
+            labels = defaultdict(list)
+            counter = 1
+
+            while heap:
+                _, _, airport_id, arrival_time, path = heapq.heappop(heap)
+                if airport_id == destination_id and path:
+                    return [leg.flight_id for leg in path]
+                if len(path) == max_legs:
+                    continue
+
+                earliest = arrival_time + (
+                    min_connection if path else timedelta()
+                )
+                latest = arrival_time + max_connection if path else None
+                visited = {source_id, *(leg.destination_id for leg in path)}
+                distance = sum(leg.distance for leg in path)
+                departures = self._departures[airport_id]
+
+                for index in range(
+                    bisect_left(departures, (earliest,)), len(departures)
+                ):
+                    leg_departure, flight_id = departures[index]
+                    if latest is not None and leg_departure > latest:
+                        break
+
+                    leg = self._legs[flight_id]
+                    if leg.destination_id in visited:
+                        continue
+
+                    label = (
+                        leg.arrival_time,
+                        len(path) + 1,
+                        distance + leg.distance,
+                    )
+                    # nothing leaves the destination in a search
+                    window = (
+                        None
+                        if leg.destination_id == destination_id
+                        else max_connection
+                    )
+                    if any(
+                        self._dominates(
+                            leg.destination_id, other, label, window
+                        )
+                        for other in labels[leg.destination_id]
+                    ):
+                        continue
+                    labels[leg.destination_id].append(label)
+
+                    heapq.heappush(
+                        heap,
+                        (
+                            key(*label),
+                            counter,
+                            leg.destination_id,
+                            leg.arrival_time,
+                            path + (leg,),
+                        ),
+                    )
+                    counter += 1
+
+        return None
+
+
+connection_graph = ConnectionGraph()
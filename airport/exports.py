@@ -0,0 +1,143 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.db.models import Prefetch
+
+from airport.models import Order, Ticket
+
+CHUNK_SIZE = 2000
+
+TICKET_CSV_HEADER = (
+    "order_id",
+    "order_created_at",
+    "order_paid",
+    "user_id",
+    "ticket_id",
+    "row",
+    "seat",
+    "flight_id",
+    "departure_time",
+    "source",
+    "destination",
+)
+
+
+def get_export_queryset(created_after=None, created_before=None, paid=None):
+    queryset = Order.objects.order_by("id").prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "flight__route__source",
+                "flight__route__destination",
+            ).order_by("id"),
+        )
+    )
+
+    if created_after is not None:
+        queryset = queryset.filter(
+            created_at__gte=datetime.combine(created_after, time.min)
+        )
+    if created_before is not None:
+        queryset = queryset.filter(
+            created_at__lt=datetime.combine(
+                created_before + timedelta(days=1), time.min
+            )
+        )
+    if paid is not None:
+        queryset = queryset.filter(paid=paid)
+
+    return queryset
+
+
+def _ticket_data(ticket):
+    flight = ticket.flight
+    return {
+        "id": ticket.id,
+        "row": ticket.row,
+        "seat": ticket.seat,
+        "flight": flight.id,
+        "departure_time": flight.departure_time.isoformat(),
+        "source": flight.route.source.name,
+        "destination": flight.route.destination.name,
+    }
+
+
+def _chunked(lines, chunk_size):
+    """
+    Join lines into chunks of ``chunk_size`` lines, so the response is
+    written in a few large pieces rather than one per row.
+    """
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_orders_ndjson(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield one JSON document per order, with its tickets nested, reading
+    ``chunk_size`` orders and their tickets at a time.
+    """
+
+    def lines():
+        for order in queryset.iterator(chunk_size=chunk_size):
+            yield json.dumps(
+                {
+                    "id": order.id,
+                    "created_at": order.created_at.isoformat(),
+                    "paid": order.paid,
+                    "user": order.user_id,
+                    "tickets": [
+                        _ticket_data(ticket) for ticket in order.tickets.all()
+                    ],
+                }
+            ) + "\n"
+
+    return _chunked(lines(), chunk_size)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_tickets_csv(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield a CSV row per ticket with the columns of its order, reading
+    ``chunk_size`` orders and their tickets at a time.
+    """
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(TICKET_CSV_HEADER)
+        for order in queryset.iterator(chunk_size=chunk_size):
+            for ticket in order.tickets.all():
+                ticket = _ticket_data(ticket)
+                yield writer.writerow(
+                    (
+                        order.id,
+                        order.created_at.isoformat(),
+                        order.paid,
+                        order.user_id,
+                        ticket["id"],
+                        ticket["row"],
+                        ticket["seat"],
+                        ticket["flight"],
+                        ticket["departure_time"],
+                        ticket["source"],
+                        ticket["destination"],
+                    )
+                )
+
+    return _chunked(lines(), chunk_size)
+
+
+EXPORTERS = {
+    "ndjson": ("application/x-ndjson", iter_orders_ndjson),
+    "csv": ("text/csv", iter_tickets_csv),
+}
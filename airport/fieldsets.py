@@ -0,0 +1,387 @@
+from django.db.models import Prefetch
+from drf_spectacular.openapi import AutoSchema
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Facility,
+    Flight,
+)
+
+# Lookups read by model attributes that are not fields: properties,
+# __str__ and the serializer method fields computed from the model.
+# Attributes missing here load every column of their model.
+COMPUTED_LOOKUPS = {
+    Airport: {"__str__": ("name",)},
+    AirplaneType: {"__str__": ("name",)},
+    Airplane: {
+        "__str__": ("name",),
+        "num_seats": ("rows", "seats_in_row"),
+    },
+    Crew: {"__str__": ("first_name", "last_name")},
+    Facility: {"__str__": ("name",)},
+    Flight: {
+        "tickets_available": (
+            "seats_sold",
+            "airplane__rows",
+            "airplane__seats_in_row",
+        ),
+        "seat_map": (
+            "seat_map",
+            "airplane__rows",
+            "airplane__seats_in_row",
+        ),
+        "taken_seats": ("tickets__row", "tickets__seat"),
+    },
+}
+
+
+def parse_fieldset(value):
+    """
+    Turn ``id,route.source,route.distance`` into
+    ``{"id": None, "route": {"source": None, "distance": None}}``,
+    where None keeps the whole field.
+    """
+    tree = {}
+    for path in filter(None, (path.strip() for path in value.split(","))):
+        node = tree
+        *parents, name = path.split(".")
+        for parent in parents:
+            if parent in node and node[parent] is None:
+                break
+            node = node.setdefault(parent, {})
+        else:
+            node[name] = None
+    return tree
+
+
+def nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.Serializer):
+        return field
+    return None
+
+
+class QueryPlan:
+    """
+    The columns, joins and prefetches a serializer reads from a model.
+
+    ``only`` and ``select`` hold lookups relative to ``model``, while
+    every prefetched relation gets a plan of its own, applied to the
+    queryset of its ``Prefetch``.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.only = {model._meta.pk.name}
+        self.select = set()
+        self.prefetch = {}
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        plan = cls(serializer.Meta.model)
+        plan.add_serializer(serializer, plan.model, "")
+        return plan
+
+    def apply(self, queryset):
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        for lookup, plan in self.prefetch.items():
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    lookup,
+                    queryset=plan.apply(plan.model._default_manager.all()),
+                )
+            )
+        return queryset.only(*self.only)
+
+    def add_serializer(self, serializer, model, prefix):
+        for field in serializer.fields.values():
+            if not field.write_only:
+                self.add_field(field, model, prefix)
+
+    def add_field(self, field, model, prefix):
+        if field.source == "*":
+            nested = nested_serializer(field)
+            if nested is not None:
+                self.add_serializer(nested, model, prefix)
+            else:
+                self.add_attribute(model, prefix, field.field_name)
+            return
+
+        *path, attr = field.source_attrs
+        for name in path:
+            relation = self.get_field(model, name)
+            if relation is None or not self.is_single(relation):
+                self.add_attribute(model, prefix, name)
+                return
+            model, prefix = self.add_select(relation, prefix)
+
+        model_field = self.get_field(model, attr)
+        if model_field is None:
+            self.add_attribute(model, prefix, attr)
+        elif not model_field.is_relation:
+            self.only.add(prefix + attr)
+        elif not self.is_single(model_field):
+            child = self.add_prefetch(model_field, prefix)
+            nested = nested_serializer(field)
+            if nested is not None:
+                child.add_serializer(nested, child.model, "")
+            elif isinstance(field, serializers.ManyRelatedField):
+                child.add_related_value(field.child_relation, child.model, "")
+            else:
+                child.add_attribute(child.model, "", "__str__")
+        elif nested_serializer(field) is not None:
+            related, related_prefix = self.add_select(model_field, prefix)
+            self.add_serializer(field, related, related_prefix)
+        elif (
+            isinstance(field, serializers.RelatedField)
+            and field.use_pk_only_optimization()
+        ):
+            self.only.add(prefix + attr)
+        else:
+            related, related_prefix = self.add_select(model_field, prefix)
+            self.add_related_value(field, related, related_prefix)
+
+    def add_related_value(self, field, model, prefix):
+        if isinstance(field, serializers.SlugRelatedField):
+            self.add_lookup(model, prefix, field.slug_field)
+        elif not (
+            isinstance(field, serializers.RelatedField)
+            and field.use_pk_only_optimization()
+        ):
+            self.add_attribute(model, prefix, "__str__")
+
+    def add_attribute(self, model, prefix, attr):
+        lookups = COMPUTED_LOOKUPS.get(model, {}).get(attr)
+        if lookups is None:
+            self.only.update(
+                prefix + field.name for field in model._meta.concrete_fields
+            )
+            return
+        for lookup in lookups:
+            self.add_lookup(model, prefix, lookup)
+
+    def add_lookup(self, model, prefix, lookup):
+        names = lookup.split("__")
+        for index, name in enumerate(names):
+            model_field = self.get_field(model, name)
+            if model_field is None or not model_field.is_relation:
+                self.only.add(prefix + name)
+                return
+            if not self.is_single(model_field):
+                child = self.add_prefetch(model_field, prefix)
+                rest = "__".join(names[index + 1 :])
+                if rest:
+                    child.add_lookup(child.model, "", rest)
+                else:
+                    child.add_attribute(child.model, "", "__str__")
+                return
+            if index == len(names) - 1:
+                self.only.add(prefix + name)
+                return
+            model, prefix = self.add_select(model_field, prefix)
+
+    def add_select(self, relation, prefix):
+        lookup = prefix + relation.name
+        self.select.add(lookup)
+        self.only.add(lookup)
+        # without a column of its own, the joined model loads all of them
+        self.only.add(f"{lookup}__{relation.related_model._meta.pk.name}")
+        return relation.related_model, f"{lookup}__"
+
+    def add_prefetch(self, relation, prefix):
+        lookup = prefix + relation.name
+        if lookup not in self.prefetch:
+            child = QueryPlan(relation.related_model)
+            if relation.one_to_many:
+                # the prefetch matches rows to their parent by this key
+                child.only.add(relation.field.name)
+            self.prefetch[lookup] = child
+        return self.prefetch[lookup]
+
+    @staticmethod
+    def get_field(model, name):
+        for model_field in model._meta.get_fields():
+            if model_field.name == name:
+                return model_field
+        return None
+
+    @staticmethod
+    def is_single(relation):
+        return relation.many_to_one or (
+            relation.one_to_one and relation.concrete
+        )
+
+
+class SparseFieldsetSchema(AutoSchema):
+    def get_override_parameters(self):
+        parameters = super().get_override_parameters()
+        view = self.view
+        if getattr(view, "action", None) not in view.fieldset_actions:
+            return parameters
+
+        expand = "relations"
+        if view.expandable_fields:
+            expand = ", ".join(view.expandable_fields)
+        return [
+            *parameters,
+            OpenApiParameter(
+                view.fields_query_param,
+                type=str,
+                description=(
+                    "Comma separated fields to return, dotted for the "
+                    "fields of nested objects (ex. ?fields=id,route.source)"
+                ),
+            ),
+            OpenApiParameter(
+                view.expand_query_param,
+                type=str,
+                description=f"Comma separated {expand} to return as objects",
+            ),
+        ]
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients pick the fields of a response with ``?fields=`` and
+    turn relations into nested objects with ``?expand=``.
+
+    Expandable relations map a dotted path to the serializer nesting
+    it in ``expandable_fields``. When either parameter is passed, the
+    queryset joins, prefetches and loads only what the remaining
+    fields read (see ``QueryPlan``).
+    """
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+    expandable_fields = {}
+    fieldset_actions = ("list", "retrieve")
+    schema = SparseFieldsetSchema()
+
+    @property
+    def sparse_fieldset(self):
+        if not hasattr(self, "_sparse_fieldset"):
+            request = getattr(self, "request", None)
+            params = getattr(request, "query_params", {})
+            self._sparse_fieldset = None
+            if self.action in self.fieldset_actions and (
+                self.fields_query_param in params
+                or self.expand_query_param in params
+            ):
+                expand = params.get(self.expand_query_param, "")
+                self._sparse_fieldset = (
+                    parse_fieldset(params.get(self.fields_query_param, "")),
+                    [
+                        path
+                        for path in map(str.strip, expand.split(","))
+                        if path
+                    ],
+                )
+        return self._sparse_fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fieldset is not None:
+            fields, expand = self.sparse_fieldset
+            root = nested_serializer(serializer)
+            self.expand_fields(root, expand)
+            if fields:
+                self.select_fields(root, fields, "")
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.sparse_fieldset is None:
+            return queryset
+
+        plan = QueryPlan.for_serializer(
+            nested_serializer(self.get_serializer())
+        )
+        keyset_field = getattr(self.paginator, "keyset_field", None)
+        if keyset_field and not self.detail:
+            # the cursor of the next page is read from the last row
+            plan.only.add(keyset_field)
+        return plan.apply(queryset)
+
+    def get_values_serializer(self):
+        if self.sparse_fieldset is not None:
+            return None
+        return super().get_values_serializer()
+
+    def expand_fields(self, root, expand):
+        # expanding route.source expands route first
+        paths = {
+            ".".join(names[: depth + 1])
+            for names in (path.split(".") for path in expand)
+            for depth in range(len(names))
+        }
+
+        for path in sorted(paths, key=lambda path: path.count(".")):
+            *parents, name = path.split(".")
+            parent = root
+            for parent_name in parents:
+                parent = nested_serializer(parent.fields.get(parent_name))
+                if parent is None:
+                    raise ValidationError(
+                        {
+                            self.expand_query_param: [
+                                f'Field "{path}" cannot be expanded.'
+                            ]
+                        }
+                    )
+            field = parent.fields.get(name)
+            if field is not None and nested_serializer(field) is not None:
+                continue
+
+            serializer_class = self.expandable_fields.get(path)
+            if serializer_class is None:
+                raise ValidationError(
+                    {
+                        self.expand_query_param: [
+                            f'Field "{path}" cannot be expanded.'
+                        ]
+                    }
+                )
+            source = field.source if field is not None else name
+            relation = parent.Meta.model._meta.get_field(source)
+            parent.fields[name] = serializer_class(
+                many=relation.many_to_many or relation.one_to_many,
+                read_only=True,
+                **({"source": source} if source != name else {}),
+            )
+
+    def select_fields(self, serializer, fields, prefix):
+        for name in fields:
+            if name not in serializer.fields:
+                raise ValidationError(
+                    {
+                        self.fields_query_param: [
+                            f'Unknown field "{prefix}{name}".'
+                        ]
+                    }
+                )
+        for name in list(serializer.fields):
+            if name not in fields:
+                serializer.fields.pop(name)
+
+        for name, nested_fields in fields.items():
+            if nested_fields is None:
+                continue
+            nested = nested_serializer(serializer.fields[name])
+            if nested is None:
+                raise ValidationError(
+                    {
+                        self.fields_query_param: [
+                            f'Field "{prefix}{name}" has no nested fields.'
+                        ]
+                    }
+                )
+            self.select_fields(nested, nested_fields, f"{prefix}{name}.")
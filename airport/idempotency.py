@@ -0,0 +1,136 @@
+import hashlib
+
+import orjson
+from django.conf import settings
+from django.core.cache import caches
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+def request_fingerprint(request):
+    """Hash of the method, path and parsed body of ``request``."""
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str)
+
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Let clients retry ``create`` safely with an Idempotency-Key header.
+
+    The first request with a key claims it in the idempotency cache
+    with ``cache.add``, which only one of concurrent requests wins, and
+    stores its successful response there for IDEMPOTENCY_KEY_TTL. A
+    retry with the same key and body gets that response replayed
+    without running ``create`` again, a concurrent one gets 409 while
+    the first is in progress, and one with a different body gets 422.
+    A failed request frees its key. Keys are scoped to the user and
+    path. Requests without the header are not affected.
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_KEY_HEADER,
+                type=str,
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "Unique key of this request, e.g. a UUID, to retry it "
+                    "without creating twice: a retry within "
+                    "IDEMPOTENCY_KEY_TTL gets the first response replayed"
+                ),
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_KEY_HEADER: [
+                        "Must be between 1 and 255 characters."
+                    ]
+                }
+            )
+
+        cache = caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+        cache_key = "airport:idempotency:%s:%s" % (
+            request.user.pk,
+            hashlib.sha256(f"{request.path}\0{key}".encode()).hexdigest(),
+        )
+        fingerprint = request_fingerprint(request)
+
+        if not cache.add(
+            cache_key,
+            {"fingerprint": fingerprint, "response": None},
+            settings.IDEMPOTENCY_LOCK_TIMEOUT,
+        ):
+            return self.stored_response(cache.get(cache_key), fingerprint)
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            # nothing was created, a retry runs the request again
+            cache.delete(cache_key)
+            raise
+
+        if not status.is_success(response.status_code):
+            cache.delete(cache_key)
+            return response
+
+        cache.set(
+            cache_key,
+            {
+                "fingerprint": fingerprint,
+                "response": (
+                    response.status_code,
+                    response.data,
+                    {
+                        header: response[header]
+                        for header in ("Location",)
+                        if response.has_header(header)
+                    },
+                ),
+            },
+            settings.IDEMPOTENCY_KEY_TTL,
+        )
+        return response
+
+    def stored_response(self, stored, fingerprint):
+        if stored is not None and stored["fingerprint"] != fingerprint:
+            return Response(
+                {
+                    "detail": "This Idempotency-Key was used for a "
+                    "different request."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        if stored is None or stored["response"] is None:
+            # in progress, or it has just expired
+            return Response(
+                {
+                    "detail": "A request with this Idempotency-Key is "
+                    "in progress, retry later."
+                },
+                status=status.HTTP_409_CONFLICT,
+                headers={"Retry-After": "1"},
+            )
+
+        status_code, data, headers = stored["response"]
+        response = Response(data, status=status_code, headers=headers)
+        response["Idempotent-Replayed"] = "true"
+        return response
@@ -0,0 +1,123 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from airport.cache import invalidate_response_cache
+
+logger = logging.getLogger(__name__)
+
+# Pillow format, file extension and save options of every variant file
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                thread_name_prefix="image-variants",
+            )
+        return _executor
+
+
+def generate_variants(field, name):
+    """
+    Save resized copies of image ``name`` of the image ``field`` to its
+    storage, one per IMAGE_VARIANTS box and format, and return their
+    sizes and names:
+    ``{"thumbnail": {"width": 160, "height": 90, "webp": ..., ...}}``.
+    """
+    storage = field.storage
+    variants = {}
+
+    with storage.open(name) as file, Image.open(file) as image:
+        # let JPEG decode straight at a fraction of the full size
+        image.draft("RGB", max(settings.IMAGE_VARIANTS.values()))
+        image = ImageOps.exif_transpose(image)
+        opaque = image.mode in ("RGB", "L")
+
+        for variant, box in settings.IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail(box, Image.LANCZOS)
+            files = {"width": resized.width, "height": resized.height}
+
+            for extension, (image_format, options) in FORMATS.items():
+                mode = "RGB" if opaque or image_format == "JPEG" else "RGBA"
+                buffer = BytesIO()
+                resized.convert(mode).save(buffer, image_format, **options)
+                files[extension] = storage.save(
+                    field.generate_filename(None, f"{variant}.{extension}"),
+                    ContentFile(buffer.getvalue()),
+                )
+            variants[variant] = files
+
+    return variants
+
+
+def save_variants(model, pk, name, reuse=True):
+    """
+    Store the variants of image ``name`` on the ``model`` row ``pk``,
+    unless its image has changed in the meantime, and return whether
+    they were stored. Variants another row has for the same image are
+    reused unless ``reuse`` is false; the stored image names depend on
+    the content only, so these are the files generating would save.
+    """
+    variants = None
+    if reuse:
+        variants = (
+            model.objects.filter(image=name)
+            .exclude(image_variants={})
+            .values_list("image_variants", flat=True)
+            .first()
+        )
+    if not variants or variants.keys() != settings.IMAGE_VARIANTS.keys():
+        try:
+            variants = generate_variants(model._meta.get_field("image"), name)
+        except (OSError, Image.DecompressionBombError):
+            logger.exception("Cannot resize %s", name)
+            return False
+
+    updated = model.objects.filter(pk=pk, image=name).update(
+        image_variants=variants
+    )
+    if updated:
+        invalidate_response_cache(model)
+    return bool(updated)
+
+
+def _save_variants_in_worker(model, pk, name):
+    close_old_connections()
+    try:
+        save_variants(model, pk, name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(model, pk, name):
+    """
+    Generate the variants of image ``name`` in the IMAGE_WORKERS pool
+    once the current transaction commits, or right then with no
+    workers.
+    """
+
+    def submit():
+        if settings.IMAGE_WORKERS:
+            get_executor().submit(_save_variants_in_worker, model, pk, name)
+        else:
+            save_variants(model, pk, name)
+
+    transaction.on_commit(submit)
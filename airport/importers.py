@@ -0,0 +1,186 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from airport.cache import invalidate_response_cache
+from airport.models import Airplane, Flight, Route
+from airport.serializers import FlightImportSerializer
+
+
+def decode_lines(lines, encoding="utf-8"):
+    for line in lines:
+        yield line.decode(encoding, errors="replace")
+
+
+def read_csv(lines):
+    """
+    Yield ``(line number, row)`` for every CSV record, leaving out
+    empty columns so that they count as missing.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and value and value.strip()
+        }
+
+
+def read_ndjson(lines):
+    """
+    Yield ``(line number, row)`` for every non-empty line. A line that
+    is not valid JSON is yielded as is and fails validation as a row
+    that is not an object.
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, line
+
+
+READERS = {
+    "csv": read_csv,
+    "ndjson": read_ndjson,
+}
+
+EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+def guess_format(filename):
+    return EXTENSIONS.get(os.path.splitext(filename or "")[1].lower())
+
+
+class FlightScheduleImporter:
+    """
+    Import flights from schedule rows, ``batch_size`` rows at a time.
+
+    Every batch loads the routes and airplanes it references that are
+    not known yet in a few queries, validates its rows against them
+    and inserts the valid ones with one ``bulk_create`` in its own
+    transaction, so invalid rows are reported without aborting the
+    import and memory use does not grow with the file.
+    """
+
+    def __init__(self, batch_size=1000, max_errors=1000):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.routes = {}
+        self.route_pairs = {}
+        self.airplanes = {}
+        self.serializer = FlightImportSerializer(context={"lookups": self})
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+    @staticmethod
+    def _int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def load_references(self, batch):
+        route_ids, route_pairs, airplane_ids = set(), set(), set()
+        for _, row in batch:
+            if not isinstance(row, dict):
+                continue
+
+            route_id = self._int(row.get("route"))
+            if route_id is not None:
+                route_ids.add(route_id)
+            pair = (
+                self._int(row.get("source")),
+                self._int(row.get("destination")),
+            )
+            if None not in pair:
+                route_pairs.add(pair)
+            airplane_id = self._int(row.get("airplane"))
+            if airplane_id is not None:
+                airplane_ids.add(airplane_id)
+
+        route_ids -= self.routes.keys()
+        if route_ids:
+            self.routes.update(Route.objects.only("id").in_bulk(route_ids))
+
+        route_pairs -= self.route_pairs.keys()
+        if route_pairs:
+            sources, destinations = map(set, zip(*route_pairs))
+            for route in (
+                Route.objects.filter(
+                    source_id__in=sources,
+                    destination_id__in=destinations,
+                )
+                .only("id", "source", "destination")
+                .order_by("id")
+            ):
+                pair = (route.source_id, route.destination_id)
+                if pair in route_pairs:
+                    self.route_pairs.setdefault(pair, route)
+
+        airplane_ids -= self.airplanes.keys()
+        if airplane_ids:
+            self.airplanes.update(
+                Airplane.objects.only("id", "rows", "seats_in_row").in_bulk(
+                    airplane_ids
+                )
+            )
+
+    def import_batch(self, batch):
+        self.load_references(batch)
+
+        flights = []
+        for line, row in batch:
+            try:
+                attrs = self.serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                self.failed += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append({"line": line, "errors": exc.detail})
+                continue
+
+            flights.append(
+                Flight(
+                    seat_map=attrs["airplane"].pack_seats([]),
+                    seats_sold=0,
+                    **attrs,
+                )
+            )
+
+        if not flights:
+            return
+
+        with transaction.atomic():
+            Flight.objects.bulk_create(flights)
+            # bulk_create skips the signals bumping the flight version
+            invalidate_response_cache(Flight)
+        self.created += len(flights)
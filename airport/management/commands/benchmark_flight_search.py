@@ -0,0 +1,130 @@
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+
+
+class Command(BaseCommand):
+    help = (
+        "Time /flights/search/ queries and print their query plan, "
+        "optionally against a generated schedule that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many flights inside a rolled back transaction",
+        )
+        parser.add_argument(
+            "--airports",
+            type=int,
+            default=300,
+            help="Number of generated airports",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=50,
+            help="Number of timed search queries",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                self.seed(options["seed"], options["airports"])
+            self.benchmark(options["runs"])
+            transaction.set_rollback(True)
+
+    def seed(self, flights_count, airports_count):
+        self.stdout.write(f"Generating {flights_count} flights...")
+        airports = Airport.objects.bulk_create(
+            Airport(
+                name=f"Benchmark {number}",
+                closest_big_city=f"City {number}",
+                country="Benchmark",
+            )
+            for number in range(airports_count)
+        )
+        routes = Route.objects.bulk_create(
+            Route(
+                source=source,
+                destination=random.choice(airports),
+                distance=random.randint(300, 9000),
+            )
+            for source in airports
+            for _ in range(10)
+        )
+        airplane = Airplane.objects.create(
+            name="Benchmark",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Benchmark"),
+        )
+
+        start = datetime.combine(date.today(), datetime.min.time())
+        batch = []
+        for _ in range(flights_count):
+            departure_time = start + timedelta(
+                minutes=random.randint(0, 525600)
+            )
+            batch.append(
+                Flight(
+                    route=random.choice(routes),
+                    airplane=airplane,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + timedelta(hours=3),
+                    seats_sold=random.randint(0, airplane.num_seats),
+                )
+            )
+            if len(batch) == 10000:
+                Flight.objects.bulk_create(batch)
+                batch = []
+        Flight.objects.bulk_create(batch)
+
+    def benchmark(self, runs):
+        routes = list(Route.objects.values_list("source_id", "destination_id"))
+        if not routes:
+            self.stdout.write(
+                self.style.WARNING("No routes to search, use --seed")
+            )
+            return
+
+        timings = []
+        queryset = None
+        for _ in range(runs):
+            source, destination = random.choice(routes)
+            departure_after = date.today() + timedelta(
+                days=random.randint(0, 300)
+            )
+            queryset = (
+                Flight.objects.search(
+                    source=source,
+                    destination=destination,
+                    departure_after=departure_after,
+                    departure_before=departure_after + timedelta(days=7),
+                    min_seats=1,
+                )
+                .select_related("airplane", "route__destination")
+                .order_by("-departure_time", "-id")
+            )
+            started = time.perf_counter()
+            list(queryset[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(queryset.explain())
+        timings.sort()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{runs} searches: "
+                f"median {statistics.median(timings):.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, "
+                f"max {timings[-1]:.2f} ms"
+            )
+        )
@@ -0,0 +1,169 @@
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Facility,
+    Flight,
+    Route,
+)
+from airport.serializers import (
+    AirplaneListSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+)
+from airport.values_serializers import (
+    AirplaneListValuesSerializer,
+    FlightListValuesSerializer,
+    RouteListValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per-row cost of the DRF list serializers with the "
+        "values() serializers on a generated dataset that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000,
+            help="Number of generated flights, routes and airplanes",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Number of timed runs, the median is reported",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+
+        with transaction.atomic():
+            self.seed(rows)
+            cases = (
+                (
+                    "flights",
+                    Flight.objects.select_related(
+                        "airplane", "route__destination"
+                    ),
+                    FlightListSerializer,
+                    FlightListValuesSerializer,
+                ),
+                (
+                    "routes",
+                    Route.objects.select_related("source", "destination"),
+                    RouteListSerializer,
+                    RouteListValuesSerializer,
+                ),
+                (
+                    "airplanes",
+                    Airplane.objects.select_related(
+                        "airplane_type"
+                    ).prefetch_related("facilities", "crew"),
+                    AirplaneListSerializer,
+                    AirplaneListValuesSerializer,
+                ),
+            )
+            for (
+                name,
+                queryset,
+                serializer_class,
+                values_serializer_class,
+            ) in cases:
+                # existing rows are serialized too
+                count = queryset.count()
+                serializer_time = self.measure(
+                    lambda: serializer_class(queryset.all(), many=True).data,
+                    options["runs"],
+                )
+                values_serializer = values_serializer_class()
+                values_time = self.measure(
+                    lambda: values_serializer.to_representation(
+                        values_serializer.get_values(queryset.all())
+                    ),
+                    options["runs"],
+                )
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{name}: serializer "
+                        f"{serializer_time * 1e6 / count:.1f} us/row, "
+                        f"values {values_time * 1e6 / count:.1f} us/row, "
+                        f"{serializer_time / values_time:.1f}x faster"
+                    )
+                )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(serialize, runs):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def seed(self, rows):
+        self.stdout.write(f"Generating {rows} rows of each model...")
+        airports = Airport.objects.bulk_create(
+            Airport(
+                name=f"Benchmark {i}",
+                closest_big_city="City",
+                country="Country",
+            )
+            for i in range(rows)
+        )
+        airplane_type = AirplaneType.objects.create(name="Benchmark")
+        facilities = Facility.objects.bulk_create(
+            Facility(name=f"Facility {i}") for i in range(3)
+        )
+        crew = Crew.objects.bulk_create(
+            Crew(first_name=f"First {i}", last_name="Last", position="pilot")
+            for i in range(3)
+        )
+        airplanes = Airplane.objects.bulk_create(
+            Airplane(
+                name=f"Benchmark {i}",
+                rows=30,
+                seats_in_row=6,
+                airplane_type=airplane_type,
+            )
+            for i in range(rows)
+        )
+        Airplane.facilities.through.objects.bulk_create(
+            Airplane.facilities.through(airplane=airplane, facility=facility)
+            for airplane in airplanes
+            for facility in facilities
+        )
+        Airplane.crew.through.objects.bulk_create(
+            Airplane.crew.through(airplane=airplane, crew=member)
+            for airplane in airplanes
+            for member in crew
+        )
+        routes = Route.objects.bulk_create(
+            Route(
+                source=airports[i], destination=airports[-i - 1], distance=1000
+            )
+            for i in range(rows)
+        )
+        departure = datetime(2023, 9, 5, 18)
+        Flight.objects.bulk_create(
+            Flight(
+                route=routes[i],
+                airplane=airplanes[i],
+                departure_time=departure + timedelta(hours=i),
+                arrival_time=departure + timedelta(hours=i + 1),
+            )
+            for i in range(rows)
+        )
@@ -0,0 +1,182 @@
+import io
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.parsers import ORJSONParser
+from airport.renderers import ORJSONRenderer
+from airport.serializers import FlightListSerializer, OrderDetailSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stdlib JSON renderer and parser with the orjson ones "
+        "on a flight page and a large order generated and rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--flights",
+            type=int,
+            default=100,
+            help="Number of flights in the flight page",
+        )
+        parser.add_argument(
+            "--tickets",
+            type=int,
+            default=2000,
+            help="Number of tickets in the order",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=20,
+            help="Number of timed runs, the median is reported",
+        )
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+
+        with transaction.atomic():
+            flights, order = self.seed(
+                max(options["flights"], 1), options["tickets"]
+            )
+            flight_page = {
+                "count": len(flights),
+                "next": None,
+                "previous": None,
+                "results": FlightListSerializer(flights, many=True).data,
+            }
+            order = (
+                Order.objects.filter(pk=order.pk)
+                .prefetch_related(
+                    "tickets__flight__route__destination",
+                    "tickets__flight__airplane",
+                )
+                .get()
+            )
+            order_data = OrderDetailSerializer(order).data
+            transaction.set_rollback(True)
+
+        order_body = json.dumps(
+            {
+                "tickets": [
+                    {
+                        "row": ticket["row"],
+                        "seat": ticket["seat"],
+                        "flight": ticket["flight"]["id"],
+                    }
+                    for ticket in order_data["tickets"]
+                ]
+            }
+        ).encode()
+
+        tickets = len(order_data["tickets"])
+        for name, data in (
+            (f"{len(flights)} flights page", flight_page),
+            (f"order with {tickets} tickets", order_data),
+        ):
+            self.compare(
+                f"render {name}",
+                lambda: JSONRenderer().render(data),
+                lambda: ORJSONRenderer().render(data),
+                runs,
+            )
+        self.compare(
+            f"parse order with {tickets} tickets",
+            lambda: JSONParser().parse(io.BytesIO(order_body)),
+            lambda: ORJSONParser().parse(io.BytesIO(order_body)),
+            runs,
+        )
+
+    def compare(self, name, stdlib, fast, runs):
+        stdlib_time = self.measure(stdlib, runs)
+        fast_time = self.measure(fast, runs)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{name}: json {stdlib_time * 1000:.2f} ms, "
+                f"orjson {fast_time * 1000:.2f} ms, "
+                f"{stdlib_time / fast_time:.1f}x faster"
+            )
+        )
+
+    @staticmethod
+    def measure(function, runs):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def seed(self, flights, tickets):
+        self.stdout.write(
+            f"Generating {flights} flights and {tickets} tickets..."
+        )
+        source = Airport.objects.create(
+            name="Benchmark", closest_big_city="City", country="Country"
+        )
+        airports = Airport.objects.bulk_create(
+            Airport(
+                name=f"Benchmark {i}",
+                closest_big_city="City",
+                country="Country",
+            )
+            for i in range(flights)
+        )
+        routes = Route.objects.bulk_create(
+            Route(source=source, destination=airport, distance=1000)
+            for airport in airports
+        )
+        airplane = Airplane.objects.create(
+            name="Benchmark",
+            rows=60,
+            seats_in_row=10,
+            airplane_type=AirplaneType.objects.create(name="Benchmark"),
+        )
+        departure = datetime(2023, 9, 5, 18)
+        flight_list = Flight.objects.bulk_create(
+            Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=departure + timedelta(hours=i),
+                arrival_time=departure + timedelta(hours=i + 1),
+            )
+            for i, route in enumerate(routes)
+        )
+        user = get_user_model().objects.create_user(
+            "benchmark@example.com", "benchmark"
+        )
+        order = Order.objects.create(user=user)
+        seats = airplane.rows * airplane.seats_in_row
+        Ticket.objects.bulk_create(
+            Ticket(
+                row=i % seats // airplane.seats_in_row + 1,
+                seat=i % airplane.seats_in_row + 1,
+                flight=flight_list[i // seats % len(flight_list)],
+                order=order,
+            )
+            for i in range(min(tickets, seats * len(flight_list)))
+        )
+        flight_list = list(
+            Flight.objects.filter(
+                pk__in=[flight.pk for flight in flight_list]
+            ).select_related("airplane", "route__destination")
+        )
+        return flight_list, order
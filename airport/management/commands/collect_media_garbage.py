@@ -0,0 +1,84 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.images import FORMATS
+from airport.models import AirplaneType, Airport
+from airport.storage import TEMPORARY_SUFFIX, is_blob
+
+
+def walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the stored image files no airport or airplane type "
+        "references, meant to run daily"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=24 * 60 * 60,
+            help="Keep files modified less than this many seconds ago, "
+            "which rows being saved may not reference yet",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the files that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        referenced = set()
+        directories = set()
+        for model in (Airport, AirplaneType):
+            field = model._meta.get_field("image")
+            directories.add((field.storage, field.upload_to.rstrip("/")))
+            for name, variants in model.objects.values_list(
+                "image", "image_variants"
+            ).iterator():
+                referenced.add(name)
+                for files in variants.values():
+                    referenced.update(
+                        files.get(extension) for extension in FORMATS
+                    )
+
+        modified_before = timezone.now() - timedelta(
+            seconds=options["min_age"]
+        )
+        deleted = freed = 0
+        for storage, directory in directories:
+            if not storage.exists(directory):
+                continue
+
+            for name in walk(storage, directory):
+                # files stored before content addressing are left alone
+                if name in referenced or not (
+                    is_blob(name) or name.endswith(TEMPORARY_SUFFIX)
+                ):
+                    continue
+                if storage.get_modified_time(name) >= modified_before:
+                    continue
+
+                deleted += 1
+                freed += storage.size(name)
+                if options["dry_run"]:
+                    self.stdout.write(name)
+                else:
+                    storage.delete(name)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Would delete' if options['dry_run'] else 'Deleted'} "
+                f"{deleted} files, {freed} bytes"
+            )
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from airport.images import save_variants
+from airport.models import AirplaneType, Airport
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the resized variants of airport and airplane type "
+        "images that have none, e.g. images uploaded before variants"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate the variants of every image, e.g. after "
+            "IMAGE_VARIANTS changed",
+        )
+
+    def handle(self, *args, **options):
+        generated = 0
+        for model in (Airport, AirplaneType):
+            rows = model.objects.exclude(image="").exclude(image=None)
+            if not options["all"]:
+                rows = rows.filter(image_variants={})
+
+            for pk, name in rows.values_list("pk", "image").iterator():
+                if save_variants(model, pk, name, reuse=not options["all"]):
+                    generated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated variants of {generated} images")
+        )
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.models import FlightSchedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the flights of every active flight schedule up to the "
+        "rolling horizon, meant to run daily"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.FLIGHT_SCHEDULE_HORIZON.days,
+            help="Number of days ahead to create flights for",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of flights inserted per query",
+        )
+
+    def handle(self, *args, **options):
+        until = timezone.now().date() + timedelta(days=options["days"])
+        created = FlightSchedule.materialize(
+            until,
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} flights up to {until}")
+        )
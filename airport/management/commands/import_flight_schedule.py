@@ -0,0 +1,71 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.importers import (
+    READERS,
+    FlightScheduleImporter,
+    decode_lines,
+    guess_format,
+)
+
+
+class Command(BaseCommand):
+    help = "Import flights from a CSV or NDJSON schedule file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Schedule file, - to read standard input",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Schedule format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows validated and inserted per transaction",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=1000,
+            help="Number of invalid rows reported in detail",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        schedule_format = options["format"] or guess_format(path)
+        if schedule_format is None:
+            raise CommandError(
+                "Cannot guess the schedule format, use --format"
+            )
+
+        importer = FlightScheduleImporter(
+            batch_size=options["batch_size"],
+            max_errors=options["max_errors"],
+        )
+        if path == "-":
+            report = importer.run(
+                READERS[schedule_format](decode_lines(sys.stdin.buffer))
+            )
+        else:
+            try:
+                with open(path, "rb") as schedule:
+                    report = importer.run(
+                        READERS[schedule_format](decode_lines(schedule))
+                    )
+            except OSError as exc:
+                raise CommandError(exc)
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} flights, "
+                f"{report['failed']} rows failed"
+            )
+        )
@@ -0,0 +1,102 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent GET requests to running servers and compare "
+        "their throughput and latency, e.g. the WSGI /flights/ endpoint "
+        "against the ASGI /async/flights/ one on the same database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls",
+            nargs="+",
+            help="Full URLs to load, each one is measured separately",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of requests sent to every URL",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Number of requests in flight at the same time",
+        )
+        parser.add_argument(
+            "--token",
+            default="",
+            help="JWT access token sent as a Bearer authorization header",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30,
+            help="Seconds to wait for a single response",
+        )
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        for url in options["urls"]:
+            self.load(
+                url,
+                headers,
+                options["requests"],
+                options["concurrency"],
+                options["timeout"],
+            )
+
+    @staticmethod
+    def fetch(url, headers, timeout):
+        started = time.perf_counter()
+        try:
+            with urlopen(
+                Request(url, headers=headers), timeout=timeout
+            ) as response:
+                response.read()
+                ok = response.status == 200
+        except (HTTPError, URLError, OSError):
+            ok = False
+
+        return ok, (time.perf_counter() - started) * 1000
+
+    def load(self, url, headers, requests_count, concurrency, timeout):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            started = time.perf_counter()
+            results = list(
+                executor.map(
+                    lambda _: self.fetch(url, headers, timeout),
+                    range(requests_count),
+                )
+            )
+            elapsed = time.perf_counter() - started
+
+        timings = sorted(timing for ok, timing in results if ok)
+        errors = len(results) - len(timings)
+        if not timings:
+            self.stdout.write(
+                self.style.ERROR(f"{url}: all {errors} requests failed")
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{url}: {len(timings) / elapsed:.1f} req/s, "
+                f"median {statistics.median(timings):.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, "
+                f"max {timings[-1]:.2f} ms, "
+                f"{errors} errors"
+            )
+        )
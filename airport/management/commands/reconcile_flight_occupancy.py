@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    help = "Recompute flight seat maps and sold seat counters from tickets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "flights",
+            nargs="*",
+            type=int,
+            help="Flight ids to reconcile, all flights by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of flights reconciled per transaction",
+        )
+
+    def handle(self, *args, **options):
+        queryset = (
+            Flight.objects.select_related("airplane")
+            .select_for_update(of=("self",))
+            .order_by("id")
+        )
+        if options["flights"]:
+            queryset = queryset.filter(id__in=options["flights"])
+
+        batch_size = options["batch_size"]
+        checked = drifted = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                drifted += Flight.rebuild_occupancy(batch)
+
+            checked += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {checked} flights, fixed {drifted} with drift"
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Delete seat holds whose time to live has passed"
+
+    def handle(self, *args, **options):
+        released, _ = SeatHold.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Released {released} seat holds")
+        )
@@ -0,0 +1,257 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+LABEL_NAMES = ("method", "endpoint", "status")
+# other method tokens are labelled "other", clients choose them freely
+HTTP_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE")
+)
+
+
+class Histogram:
+    """
+    A Prometheus histogram of one process, with cumulative buckets
+    per set of label values.
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.series = {}
+
+    def observe(self, labels, value):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = sorted(self.series.items())
+            for labels, values in series:
+                label_text = ",".join(
+                    f'{name}="{escape_label(value)}"'
+                    for name, value in zip(LABEL_NAMES, labels)
+                )
+                for bound, count in zip(self.buckets, values["buckets"]):
+                    lines.append(
+                        f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                        f"{count}"
+                    )
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="+Inf"}} '
+                    f'{values["count"]}'
+                )
+                lines.append(
+                    f'{self.name}_sum{{{label_text}}} {values["sum"]}'
+                )
+                lines.append(
+                    f'{self.name}_count{{{label_text}}} {values["count"]}'
+                )
+        return lines
+
+
+def escape_label(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+REQUEST_DURATION = Histogram(
+    "airport_http_request_duration_seconds",
+    "Time spent handling a request.",
+    DURATION_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "airport_http_request_db_duration_seconds",
+    "Time spent in database queries while handling a request.",
+    DURATION_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "airport_http_request_db_queries",
+    "Database queries run while handling a request.",
+    QUERY_COUNT_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_QUERIES)
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+# the recorder of the request measured in this context, which follows
+# it into the threads running its queries, see ``record_queries``
+current_recorder = ContextVar("current_recorder", default=None)
+
+
+def install_execute_wrapper(connection, wrapper):
+    if wrapper not in connection.execute_wrappers:
+        # first, so that execute_wrapper() blocks still pop their own
+        connection.execute_wrappers.insert(0, wrapper)
+
+
+def record_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper of every connection (see ``airport.signals``),
+    passing the queries to the recorder of the current context.
+    """
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing the queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the latency, database query count and database time of a
+    sample of the requests.
+
+    REQUEST_METRICS_SAMPLE_RATE is the share of requests measured, so
+    the histograms count sampled requests only. Measured responses get
+    a Server-Timing header. Streaming responses are measured up to the
+    first byte. Runs natively under both WSGI and ASGI, and counts the
+    queries that views run in other threads through ``sync_to_async``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        recorder, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        recorder, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    @staticmethod
+    def sampled():
+        sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        return sample_rate > 0 and random.random() < sample_rate
+
+    @staticmethod
+    def start():
+        recorder = QueryRecorder()
+        # connections opened before the receiver was connected
+        for connection in connections.all():
+            install_execute_wrapper(connection, record_queries)
+        return recorder, current_recorder.set(recorder), time.perf_counter()
+
+    @staticmethod
+    def finish(request, response, recorder, started):
+        duration = time.perf_counter() - started
+
+        resolver_match = request.resolver_match
+        labels = (
+            request.method if request.method in HTTP_METHODS else "other",
+            resolver_match.view_name if resolver_match else "unmatched",
+            str(response.status_code),
+        )
+        REQUEST_DURATION.observe(labels, duration)
+        REQUEST_DB_DURATION.observe(labels, recorder.duration)
+        REQUEST_QUERIES.observe(labels, recorder.count)
+
+        response["Server-Timing"] = (
+            f"app;dur={duration * 1000:.1f}, "
+            f"db;dur={recorder.duration * 1000:.1f};"
+            f'desc="{recorder.count} queries"'
+        )
+        return response
+
+
+def metrics_view(request):
+    """Serve the histograms in the Prometheus text format."""
+    if not (
+        request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+        or request.user.is_staff
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
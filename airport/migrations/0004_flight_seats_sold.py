@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:20
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_occupancy(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    taken_seats = defaultdict(list)
+    for flight_id, row, seat in Ticket.objects.values_list(
+        "flight_id", "row", "seat"
+    ).iterator():
+        taken_seats[flight_id].append((row, seat))
+
+    for flight in Flight.objects.select_related("airplane").iterator():
+        rows = flight.airplane.rows
+        seats_in_row = flight.airplane.seats_in_row
+        seat_map = bytearray((rows * seats_in_row + 7) // 8)
+        seats_sold = 0
+        for row, seat in taken_seats[flight.id]:
+            if 1 <= row <= rows and 1 <= seat <= seats_in_row:
+                index = (row - 1) * seats_in_row + seat - 1
+                seat_map[index // 8] |= 0x80 >> (index % 8)
+                seats_sold += 1
+        Flight.objects.filter(pk=flight.pk).update(
+            seat_map=bytes(seat_map),
+            seats_sold=seats_sold,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0003_flight_seat_map"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seats_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0007_flightschedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airplanetype",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="airport",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:06
+
+import airport.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0008_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="airplanetype",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=airport.storage.ContentAddressedStorage(),
+                upload_to="images/airplane_type/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="airport",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=airport.storage.ContentAddressedStorage(),
+                upload_to="images/airport/",
+            ),
+        ),
+    ]
@@ -1,6 +1,15 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from airport.cache import invalidate_response_cache
+from airport.storage import content_addressed_storage
 
 
 class Airport(models.Model):
@@ -11,7 +20,10 @@ class Airport(models.Model):
         null=True,
         blank=True,
         upload_to="images/airport/",
+        storage=content_addressed_storage,
     )
+    # resized copies of image, see airport.images.generate_variants
+    image_variants = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ["name"]
@@ -26,7 +38,10 @@ class AirplaneType(models.Model):
         null=True,
         blank=True,
         upload_to="images/airplane_type/",
+        storage=content_addressed_storage,
     )
+    # resized copies of image, see airport.images.generate_variants
+    image_variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return self.name
@@ -56,6 +71,23 @@ class Airplane(models.Model):
     def num_seats(self) -> int:
         return self.rows * self.seats_in_row
 
+    @property
+    def seat_map_size(self) -> int:
+        return (self.num_seats + 7) // 8
+
+    def seat_index(self, row: int, seat: int):
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            return None
+        return (row - 1) * self.seats_in_row + seat - 1
+
+    def pack_seats(self, seats) -> bytes:
+        seat_map = bytearray(self.seat_map_size)
+        for row, seat in seats:
+            index = self.seat_index(row, seat)
+            if index is not None:
+                seat_map[index // 8] |= 0x80 >> (index % 8)
+        return bytes(seat_map)
+
     def __str__(self):
         return self.name
 
@@ -94,6 +126,47 @@ class Facility(models.Model):
         return self.name
 
 
+class FlightQuerySet(models.QuerySet):
+    def search(
+        self,
+        source=None,
+        destination=None,
+        departure_after=None,
+        departure_before=None,
+        min_seats=None,
+    ):
+        queryset = self
+
+        if source is not None or destination is not None:
+            routes = Route.objects.all()
+            if source is not None:
+                routes = routes.filter(source_id=source)
+            if destination is not None:
+                routes = routes.filter(destination_id=destination)
+            queryset = queryset.filter(route__in=routes.values("id"))
+
+        if departure_after is not None:
+            queryset = queryset.filter(
+                departure_time__gte=datetime.combine(departure_after, time.min)
+            )
+
+        if departure_before is not None:
+            queryset = queryset.filter(
+                departure_time__lt=datetime.combine(
+                    departure_before + timedelta(days=1), time.min
+                )
+            )
+
+        if min_seats is not None:
+            queryset = queryset.alias(
+                available_seats=F("airplane__rows")
+                * F("airplane__seats_in_row")
+                - F("seats_sold")
+            ).filter(available_seats__gte=min_seats)
+
+        return queryset
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         "Route",
@@ -107,9 +180,149 @@ class Flight(models.Model):
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    schedule = models.ForeignKey(
+        "FlightSchedule",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="flights",
+    )
+    seat_map = models.BinaryField(default=b"", editable=False)
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    # lets the connection graph reload only the flights changed since
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # maintained by ticket inserts and deletes, never by Flight.save()
+    OCCUPANCY_FIELDS = ("seat_map", "seats_sold")
+
+    objects = FlightQuerySet.as_manager()
 
     class Meta:
         ordering = ["-departure_time"]
+        indexes = [
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+            # keyset pagination (FlightPagination)
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_id_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "departure_time"],
+                condition=models.Q(schedule__isnull=False),
+                name="flight_schedule_departure_unique",
+            ),
+        ]
+
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        if self._state.adding:
+            self.seat_map = self.airplane.pack_seats([])
+            self.seats_sold = 0
+        elif update_fields is None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.OCCUPANCY_FIELDS
+            ]
+        return super(Flight, self).save(
+            force_insert, force_update, using, update_fields
+        )
+
+    @property
+    def tickets_available(self) -> int:
+        return self.airplane.num_seats - self.seats_sold
+
+    def get_seat_map(self) -> bytes:
+        seat_map = bytes(self.seat_map)
+        if len(seat_map) != self.airplane.seat_map_size:
+            seat_map = self.airplane.pack_seats(
+                self.tickets.values_list("row", "seat")
+            )
+        return seat_map
+
+    def is_seat_taken(self, row: int, seat: int) -> bool:
+        index = self.airplane.seat_index(row, seat)
+        if index is None:
+            return False
+        return bool(self.get_seat_map()[index // 8] & (0x80 >> (index % 8)))
+
+    @staticmethod
+    def count_seats(seat_map) -> int:
+        return bin(int.from_bytes(seat_map, "big")).count("1")
+
+    @classmethod
+    def update_occupancy(cls, flight_id, seats, taken=True):
+        with transaction.atomic():
+            flight = (
+                cls.objects.select_for_update(of=("self",))
+                .select_related("airplane")
+                .filter(pk=flight_id)
+                .first()
+            )
+            if flight is None:
+                return
+
+            airplane = flight.airplane
+            seat_map = bytearray(flight.seat_map)
+            if len(seat_map) != airplane.seat_map_size:
+                cls.rebuild_occupancy([flight])
+                return
+
+            for row, seat in seats:
+                index = airplane.seat_index(row, seat)
+                if index is None:
+                    continue
+                if taken:
+                    seat_map[index // 8] |= 0x80 >> (index % 8)
+                else:
+                    seat_map[index // 8] &= ~(0x80 >> (index % 8))
+
+            cls.objects.filter(pk=flight_id).update(
+                seat_map=bytes(seat_map),
+                seats_sold=cls.count_seats(seat_map),
+            )
+
+    @classmethod
+    def rebuild_occupancy(cls, flights) -> int:
+        """
+        Recompute seat maps and sold seat counters from tickets,
+        return the number of flights whose stored values drifted.
+        """
+        flights = list(flights)
+        taken_seats = defaultdict(list)
+        for flight_id, row, seat in Ticket.objects.filter(
+            flight__in=flights
+        ).values_list("flight_id", "row", "seat"):
+            taken_seats[flight_id].append((row, seat))
+
+        drifted = 0
+        for flight in flights:
+            seat_map = flight.airplane.pack_seats(taken_seats[flight.pk])
+            seats_sold = cls.count_seats(seat_map)
+            if (
+                bytes(flight.seat_map) == seat_map
+                and flight.seats_sold == seats_sold
+            ):
+                continue
+
+            drifted += 1
+            cls.objects.filter(pk=flight.pk).update(
+                seat_map=seat_map,
+                seats_sold=seats_sold,
+            )
+
+        return drifted
 
 
 class Order(models.Model):
@@ -123,6 +336,13 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # keyset pagination of a user's orders (OrderPagination)
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="order_user_created_id_idx",
+            ),
+        ]
 
 
 class Route(models.Model):
@@ -139,6 +359,152 @@ class Route(models.Model):
 
     class Meta:
         ordering = ["source"]
+        indexes = [
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx",
+            ),
+        ]
+
+
+def validate_days_of_week(value):
+    if not value or any(day not in "1234567" for day in value):
+        raise ValidationError(
+            "Days of week must be ISO weekday numbers, from 1 (Monday) "
+            "to 7 (Sunday), ex. 135"
+        )
+    if len(set(value)) != len(value):
+        raise ValidationError("Days of week must not repeat")
+
+
+class FlightSchedule(models.Model):
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name="schedules",
+    )
+    airplane = models.ForeignKey(
+        Airplane,
+        on_delete=models.CASCADE,
+        related_name="schedules",
+    )
+    days_of_week = models.CharField(
+        max_length=7,
+        validators=[validate_days_of_week],
+    )
+    departure_time = models.TimeField()
+    duration = models.DurationField()
+    valid_from = models.DateField()
+    valid_until = models.DateField(null=True, blank=True)
+    # last departure date materialized into flights
+    generated_until = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["valid_from", "departure_time"]
+
+    def __str__(self):
+        return f"{self.route_id} {self.days_of_week} {self.departure_time}"
+
+    def departure_dates(self, start, end):
+        """
+        Dates between ``start`` and ``end``, inclusive, inside the
+        validity window on which the schedule operates.
+        """
+        start = max(start, self.valid_from)
+        if self.valid_until is not None:
+            end = min(end, self.valid_until)
+
+        day = start
+        while day <= end:
+            if str(day.isoweekday()) in self.days_of_week:
+                yield day
+            day += timedelta(days=1)
+
+    def build_flights(self, start, end):
+        """
+        Unsaved flights for the departures between ``start`` and
+        ``end`` that the schedule has no flight for yet, such as the
+        sold flights kept by ``reset_flights``.
+        """
+        empty_seat_map = self.airplane.pack_seats([])
+        existing = set(
+            self.flights.filter(
+                departure_time__gte=datetime.combine(start, time.min)
+            ).values_list("departure_time", flat=True)
+        )
+
+        for day in self.departure_dates(start, end):
+            departure_time = datetime.combine(day, self.departure_time)
+            if departure_time in existing:
+                continue
+            yield Flight(
+                route_id=self.route_id,
+                airplane=self.airplane,
+                schedule=self,
+                departure_time=departure_time,
+                arrival_time=departure_time + self.duration,
+                seat_map=empty_seat_map,
+                seats_sold=0,
+            )
+
+    @classmethod
+    def materialize(cls, until, schedules=None, batch_size=1000) -> int:
+        """
+        Create the flights of every active schedule up to ``until``,
+        continuing from where the previous run stopped, and return how
+        many flights were created.
+        """
+        today = timezone.now().date()
+        if schedules is None:
+            schedules = cls.objects.all()
+        schedules = (
+            schedules.filter(
+                models.Q(valid_until__isnull=True)
+                | models.Q(valid_until__gte=today),
+                models.Q(generated_until__isnull=True)
+                | models.Q(generated_until__lt=until),
+            )
+            .select_related("airplane")
+            .order_by("id")
+        )
+
+        created = 0
+        for schedule in schedules.iterator(chunk_size=batch_size):
+            start = today
+            if schedule.generated_until is not None:
+                start = max(
+                    start, schedule.generated_until + timedelta(days=1)
+                )
+
+            with transaction.atomic():
+                flights = Flight.objects.bulk_create(
+                    list(schedule.build_flights(start, until)),
+                    batch_size=batch_size,
+                )
+                cls.objects.filter(pk=schedule.pk).update(
+                    generated_until=until
+                )
+            created += len(flights)
+
+        if created:
+            # bulk_create skips the signals bumping the flight version
+            invalidate_response_cache(Flight)
+        return created
+
+    def reset_flights(self):
+        """
+        Delete the future flights of the schedule that have no tickets
+        yet, so that the next run regenerates them from the schedule.
+        """
+        with transaction.atomic():
+            self.flights.filter(
+                departure_time__gt=timezone.now(),
+                seats_sold=0,
+            ).delete()
+            FlightSchedule.objects.filter(pk=self.pk).update(
+                generated_until=None
+            )
+        self.generated_until = None
 
 
 class Ticket(models.Model):
@@ -186,9 +552,133 @@ class Ticket(models.Model):
         )
 
     def save(
-        self, force_insert=False, force_update=False, using=None, update_fields=None
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
     ):
         self.full_clean()
         return super(Ticket, self).save(
             force_insert, force_update, using, update_fields
         )
+
+
+class SeatHold(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = (
+            "row",
+            "seat",
+            "flight",
+        )
+        ordering = ["expires_at"]
+
+    @staticmethod
+    def seat_keys(seats) -> set:
+        return {
+            (seat["flight"].id, seat["row"], seat["seat"]) for seat in seats
+        }
+
+    @classmethod
+    def matching(cls, seat_keys):
+        """
+        Holds on the given (flight_id, row, seat) keys, fetched with one
+        range query and narrowed down in Python.
+        """
+        if not seat_keys:
+            return []
+
+        flight_ids, rows, seat_numbers = map(set, zip(*seat_keys))
+        return [
+            hold
+            for hold in cls.objects.filter(
+                flight_id__in=flight_ids,
+                row__in=rows,
+                seat__in=seat_numbers,
+            )
+            if (hold.flight_id, hold.row, hold.seat) in seat_keys
+        ]
+
+    @classmethod
+    def place(cls, user, seats):
+        """
+        Hold the seats for the user, renewing the holds the user already
+        has on them, but never past SEAT_HOLD_MAX_AGE from when a seat
+        was first held and never over SEAT_HOLD_MAX_PER_USER live holds.
+        """
+        now = timezone.now()
+        seat_keys = cls.seat_keys(seats)
+
+        with transaction.atomic():
+            # serializes the holds of one user so the cap is not raced
+            get_user_model().objects.select_for_update().filter(
+                pk=user.pk
+            ).first()
+
+            replaced = {
+                (hold.flight_id, hold.row, hold.seat): hold
+                for hold in cls.matching(seat_keys)
+                if hold.expires_at <= now or hold.user_id == user.id
+            }
+            live_holds = (
+                cls.objects.filter(user=user, expires_at__gt=now)
+                .exclude(id__in=[hold.id for hold in replaced.values()])
+                .count()
+            )
+            if live_holds + len(seats) > settings.SEAT_HOLD_MAX_PER_USER:
+                raise ValidationError(
+                    f"A customer can hold at most "
+                    f"{settings.SEAT_HOLD_MAX_PER_USER} seats at a time."
+                )
+            cls.objects.filter(
+                id__in=[hold.id for hold in replaced.values()]
+            ).delete()
+
+            holds = []
+            for seat in seats:
+                created_at = now
+                previous = replaced.get(
+                    (seat["flight"].id, seat["row"], seat["seat"])
+                )
+                if (
+                    previous is not None
+                    and previous.user_id == user.id
+                    and previous.expires_at > now
+                ):
+                    created_at = previous.created_at
+                holds.append(
+                    cls(
+                        user=user,
+                        created_at=created_at,
+                        expires_at=min(
+                            now + settings.SEAT_HOLD_TTL,
+                            created_at + settings.SEAT_HOLD_MAX_AGE,
+                        ),
+                        **seat,
+                    )
+                )
+            return cls.objects.bulk_create(holds)
+
+    @classmethod
+    def release(cls, user, seats):
+        held = [
+            hold.id
+            for hold in cls.matching(cls.seat_keys(seats))
+            if hold.user_id == user.id
+        ]
+        cls.objects.filter(id__in=held).delete()
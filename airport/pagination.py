@@ -0,0 +1,186 @@
+import base64
+import json
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset mode.
+
+    Passing the ``cursor`` query parameter (empty for the first page)
+    pages by ``(keyset_field, id)`` in descending order: every page is
+    a range filter on an index instead of an OFFSET, no COUNT query
+    is run and rows inserted meanwhile never shift the next pages.
+    """
+
+    cursor_query_param = "cursor"
+    keyset_field = None
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset, page_size, cursor = self.get_keyset_queryset(
+            queryset, request
+        )
+        return self.get_keyset_page(
+            list(queryset[: page_size + 1]), page_size, cursor
+        )
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Same as ``paginate_queryset``, but fetching rows with the
+        async ORM API so it can run in an async view.
+        """
+        self.keyset = self.cursor_query_param in request.query_params
+        if self.keyset:
+            queryset, page_size, cursor = self.get_keyset_queryset(
+                queryset, request
+            )
+            results = [obj async for obj in queryset[: page_size + 1]]
+            return self.get_keyset_page(results, page_size, cursor)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        self.request = request
+        return list(self.page)
+
+    def get_keyset_queryset(self, queryset, request):
+        self.request = request
+        self.model_field = queryset.model._meta.get_field(self.keyset_field)
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor[2])
+
+        if self.reverse:
+            ordering = (self.keyset_field, "id")
+        else:
+            ordering = (f"-{self.keyset_field}", "-id")
+        queryset = queryset.order_by(*ordering)
+
+        if cursor:
+            value, pk, _ = cursor
+            lookup = "gt" if self.reverse else "lt"
+            # the inclusive bound lets the (keyset_field, id) index
+            # seek to the cursor instead of scanning up to it
+            queryset = queryset.filter(
+                **{f"{self.keyset_field}__{lookup}e": value}
+            ).filter(
+                Q(**{f"{self.keyset_field}__{lookup}": value})
+                | Q(**{f"id__{lookup}": pk})
+            )
+
+        return queryset, page_size, cursor
+
+    def get_keyset_page(self, results, page_size, cursor):
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.has_next = has_more if not self.reverse else bool(cursor)
+        self.has_previous = has_more if self.reverse else bool(cursor)
+        self.page_results = results
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+
+        if not self.has_next or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+
+        if not self.has_previous or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # a row of a values() queryset
+            obj = SimpleNamespace(
+                pk=obj["id"],
+                **{self.model_field.attname: obj[self.keyset_field]},
+            )
+        position = [
+            self.model_field.value_to_string(obj),
+            obj.pk,
+            int(reverse),
+        ]
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(position).encode()
+        ).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(encoded))
+            value = self.model_field.to_python(value)
+            pk = int(pk)
+            if value is None:
+                # the keyset fields are not nullable
+                raise ValueError("null cursor value")
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return value, pk, reverse
+
+
+class FlightPagination(KeysetPagination):
+    page_size = 10
+    max_page_size = 100
+    keyset_field = "departure_time"
+
+
+class OrderPagination(KeysetPagination):
+    page_size = 10
+    max_page_size = 100
+    keyset_field = "created_at"
@@ -0,0 +1,61 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from airport.importers import READERS, decode_lines
+from airport.renderers import ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ScheduleParser(BaseParser):
+    """
+    Hand a schedule request body to the importer as a lazy iterator of
+    ``(line number, row)`` instead of reading it into memory.
+    """
+
+    format = None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        lines = decode_lines(stream if stream is not None else [], encoding)
+
+        return {"rows": READERS[self.format](lines)}
+
+
+class CSVScheduleParser(ScheduleParser):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONScheduleParser(ScheduleParser):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson, for UTF-8 bodies in strict mode.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower().replace("-", "") != "utf8"
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read() if stream is not None else b"")
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
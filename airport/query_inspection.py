@@ -0,0 +1,235 @@
+import logging
+import os
+import re
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+import airport
+from airport.metrics import install_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+AIRPORT_DIR = os.path.dirname(airport.__file__)
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO")
+SERIALIZER_TO_REPRESENTATION = serializers.Serializer.to_representation
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+VALUE_LIST = re.compile(r"\(\s*(?:%s|\?|NULL)(?:\s*,\s*(?:%s|\?|NULL))*\s*\)")
+
+# the inspectors open in this context, which follow it into the threads
+# running its queries, see ``inspect_queries``
+current_inspectors = ContextVar("current_inspectors", default=())
+
+
+def normalize_sql(sql):
+    """
+    Reduce a query to its shape: literals and parameters become ``?``
+    and value lists ``(?)``, so queries differing only in values match.
+    """
+    shape = STRING_LITERAL.sub("?", sql)
+    shape = NUMBER_LITERAL.sub("?", shape)
+    shape = VALUE_LIST.sub("(?)", shape)
+    return " ".join(shape.split())
+
+
+def serializer_field_path(frame):
+    """
+    The dotted path of the serializer fields being rendered by the
+    frames from ``frame`` outwards, e.g. ``tickets.flight.destination``.
+    """
+    code = SERIALIZER_TO_REPRESENTATION.__code__
+    path = []
+    while frame is not None:
+        if frame.f_code is code:
+            field = frame.f_locals.get("field")
+            if field is not None:
+                path.append(field.field_name)
+        frame = frame.f_back
+    return ".".join(reversed(path))
+
+
+def code_location(frame):
+    """The innermost line of this app outside this module."""
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(AIRPORT_DIR) and filename != __file__:
+            return f"{os.path.relpath(filename)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return ""
+
+
+@dataclass
+class QueryProblem:
+    kind: str
+    sql: str
+    count: int
+    duration: float
+    field_path: str
+    location: str
+
+    def __str__(self):
+        origin = ", ".join(
+            filter(
+                None,
+                (
+                    self.field_path and f"field {self.field_path}",
+                    self.location,
+                ),
+            )
+        )
+        return (
+            f"{self.kind}: {self.count} x {self.duration * 1000:.1f} ms"
+            f"{f' from {origin}' if origin else ''}: {self.sql}"
+        )
+
+
+def inspect_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper of every connection (see ``airport.signals``),
+    passing the queries to the inspectors of the current context.
+    """
+    for inspector in current_inspectors.get():
+        execute = partial(inspector, execute)
+    return execute(sql, params, many, context)
+
+
+class QueryInspectionError(Exception):
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__("\n".join(map(str, problems)))
+
+
+class QueryInspector:
+    """
+    Group the queries run inside the block by shape and report:
+
+    - shapes run at least ``repeat_threshold`` times, the mark of an
+      N+1 pattern, with the serializer field path and the line of code
+      that ran them first,
+    - queries slower than ``slow_threshold`` seconds.
+    """
+
+    def __init__(self, repeat_threshold=None, slow_threshold=None):
+        self.repeat_threshold = (
+            repeat_threshold or settings.QUERY_INSPECTION_REPEAT_THRESHOLD
+        )
+        self.slow_threshold = (
+            slow_threshold or settings.QUERY_INSPECTION_SLOW_THRESHOLD
+        )
+        self.shapes = {}
+        self.slow_queries = []
+
+    def __enter__(self):
+        # connections opened before the receiver was connected
+        for connection in connections.all():
+            install_execute_wrapper(connection, inspect_queries)
+        self.token = current_inspectors.set(current_inspectors.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info):
+        current_inspectors.reset(self.token)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+                self.record(sql, duration, sys._getframe(1))
+
+    def record(self, sql, duration, frame):
+        shape = normalize_sql(sql)
+        problem = self.shapes.get(shape)
+        if problem is None:
+            # report where the first run of a shape came from
+            problem = self.shapes[shape] = QueryProblem(
+                "repeated query",
+                shape,
+                0,
+                0.0,
+                serializer_field_path(frame),
+                code_location(frame),
+            )
+        problem.count += 1
+        problem.duration += duration
+
+        if duration >= self.slow_threshold:
+            self.slow_queries.append(
+                QueryProblem(
+                    "slow query",
+                    shape,
+                    1,
+                    duration,
+                    serializer_field_path(frame),
+                    code_location(frame),
+                )
+            )
+
+    @property
+    def problems(self):
+        repeated = [
+            problem
+            for problem in self.shapes.values()
+            if problem.count >= self.repeat_threshold
+        ]
+        return repeated + self.slow_queries
+
+
+class QueryInspectionMiddleware:
+    """
+    Inspect the queries of every request when QUERY_INSPECTION is
+    ``warn``, which logs the problems, or ``raise``, which raises
+    QueryInspectionError to fail the request, e.g. in a test run.
+    Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        mode = settings.QUERY_INSPECTION
+        if mode not in ("warn", "raise"):
+            return self.get_response(request)
+
+        with QueryInspector() as inspector:
+            response = self.get_response(request)
+        return self.report(request, response, inspector, mode)
+
+    async def __acall__(self, request):
+        mode = settings.QUERY_INSPECTION
+        if mode not in ("warn", "raise"):
+            return await self.get_response(request)
+
+        with QueryInspector() as inspector:
+            response = await self.get_response(request)
+        return self.report(request, response, inspector, mode)
+
+    @staticmethod
+    def report(request, response, inspector, mode):
+        problems = inspector.problems
+        if problems:
+            if mode == "raise":
+                raise QueryInspectionError(problems)
+            for problem in problems:
+                logger.warning(
+                    "%s %s: %s", request.method, request.path, problem
+                )
+        return response
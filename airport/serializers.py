@@ -1,4 +1,10 @@
-from django.db import transaction
+import base64
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from airport.models import (
@@ -8,13 +14,61 @@ from airport.models import (
     Crew,
     Facility,
     Flight,
+    FlightSchedule,
     Order,
     Route,
+    SeatHold,
     Ticket,
 )
 
 
+@extend_schema_field(
+    {
+        "type": "object",
+        "additionalProperties": {
+            "type": "object",
+            "properties": {
+                "width": {"type": "integer"},
+                "height": {"type": "integer"},
+                "webp": {"type": "string", "format": "uri"},
+                "jpeg": {"type": "string", "format": "uri"},
+            },
+        },
+        "example": {
+            "thumbnail": {
+                "width": 160,
+                "height": 107,
+                "webp": "http://localhost/media/images/a_thumbnail.webp",
+                "jpeg": "http://localhost/media/images/a_thumbnail.jpeg",
+            },
+        },
+    }
+)
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Resized copies of the image by variant name, with their sizes and
+    file URLs, absolute like those of ImageField when the request is in
+    the context. Empty until the variants are generated.
+    """
+
+    def to_representation(self, variants):
+        storage = self.parent.Meta.model._meta.get_field("image").storage
+        request = self.context.get("request")
+        representation = {}
+        for variant, files in variants.items():
+            representation[variant] = {}
+            for key, value in files.items():
+                if isinstance(value, str):
+                    value = storage.url(value)
+                    if request is not None:
+                        value = request.build_absolute_uri(value)
+                representation[variant][key] = value
+        return representation
+
+
 class AirportSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Airport
         fields = (
@@ -23,34 +77,63 @@ class AirportSerializer(serializers.ModelSerializer):
             "closest_big_city",
             "country",
             "image",
+            "image_variants",
         )
 
 
+class AirportAutocompleteSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(
+        help_text="Beginning of the airport name, city or country words",
+    )
+    limit = serializers.IntegerField(
+        default=10,
+        min_value=1,
+        max_value=50,
+        help_text="Maximum number of airports",
+    )
+
+
+class AirportAutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    closest_big_city = serializers.CharField(read_only=True)
+    country = serializers.CharField(read_only=True)
+
+
 class AirportImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Airport
         fields = (
             "id",
             "image",
+            "image_variants",
         )
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = AirplaneType
         fields = (
             "id",
             "name",
             "image",
+            "image_variants",
         )
 
 
 class AirplaneTypeImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = AirplaneType
         fields = (
             "id",
             "image",
+            "image_variants",
         )
 
 
@@ -199,7 +282,7 @@ class FlightListSerializer(FlightSerializer):
         read_only=True,
     )
     airplane_num_seats = serializers.IntegerField(
-        source="airplane.capacity",
+        source="airplane.num_seats",
         read_only=True,
     )
     tickets_available = serializers.IntegerField(read_only=True)
@@ -217,6 +300,208 @@ class FlightListSerializer(FlightSerializer):
         )
 
 
+class FlightScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FlightSchedule
+        fields = (
+            "id",
+            "route",
+            "airplane",
+            "days_of_week",
+            "departure_time",
+            "duration",
+            "valid_from",
+            "valid_until",
+            "generated_until",
+        )
+
+    def validate(self, attrs):
+        data = super(FlightScheduleSerializer, self).validate(attrs)
+        valid_from = attrs.get(
+            "valid_from", getattr(self.instance, "valid_from", None)
+        )
+        valid_until = attrs.get(
+            "valid_until", getattr(self.instance, "valid_until", None)
+        )
+        if valid_until is not None and valid_until < valid_from:
+            raise serializers.ValidationError(
+                {"valid_until": "valid_until must not be before valid_from"}
+            )
+        return data
+
+
+class FlightSearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(
+        required=False,
+        help_text="Source airport id",
+    )
+    destination = serializers.IntegerField(
+        required=False,
+        help_text="Destination airport id",
+    )
+    departure_after = serializers.DateField(
+        required=False,
+        help_text="Earliest departure date, inclusive (ex. 2023-09-05)",
+    )
+    departure_before = serializers.DateField(
+        required=False,
+        help_text="Latest departure date, inclusive (ex. 2023-09-30)",
+    )
+    min_seats = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Minimum number of available seats",
+    )
+
+
+class FlightImportSerializer(serializers.Serializer):
+    """
+    One row of a flight schedule import. References are resolved
+    against the lookups the importer loads once per batch, passed as
+    the ``lookups`` context, instead of a query per row.
+    """
+
+    route = serializers.IntegerField(
+        required=False,
+        help_text="Route id",
+    )
+    source = serializers.IntegerField(
+        required=False,
+        help_text="Source airport id, used with destination instead of route",
+    )
+    destination = serializers.IntegerField(
+        required=False,
+        help_text="Destination airport id, used with source instead of route",
+    )
+    airplane = serializers.IntegerField(help_text="Airplane id")
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        lookups = self.context["lookups"]
+
+        if "route" in attrs:
+            route = lookups.routes.get(attrs["route"])
+            if route is None:
+                raise serializers.ValidationError(
+                    {
+                        "route": [
+                            f'Invalid pk "{attrs["route"]}" - '
+                            "object does not exist."
+                        ]
+                    }
+                )
+        elif "source" in attrs and "destination" in attrs:
+            route = lookups.route_pairs.get(
+                (attrs["source"], attrs["destination"])
+            )
+            if route is None:
+                raise serializers.ValidationError(
+                    {
+                        "route": [
+                            "There is no route from source to destination."
+                        ]
+                    }
+                )
+        else:
+            raise serializers.ValidationError(
+                {
+                    "route": [
+                        "Either route or source and destination are required."
+                    ]
+                }
+            )
+
+        airplane = lookups.airplanes.get(attrs["airplane"])
+        if airplane is None:
+            raise serializers.ValidationError(
+                {
+                    "airplane": [
+                        f'Invalid pk "{attrs["airplane"]}" - '
+                        "object does not exist."
+                    ]
+                }
+            )
+
+        if attrs["arrival_time"] <= attrs["departure_time"]:
+            raise serializers.ValidationError(
+                {
+                    "arrival_time": [
+                        "Arrival time must be after departure time."
+                    ]
+                }
+            )
+
+        return {
+            "route": route,
+            "airplane": airplane,
+            "departure_time": attrs["departure_time"],
+            "arrival_time": attrs["arrival_time"],
+        }
+
+
+class ConnectionSearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(help_text="Source airport id")
+    destination = serializers.IntegerField(help_text="Destination airport id")
+    departure_time = serializers.DateTimeField(
+        required=False,
+        help_text="Earliest departure, now by default",
+    )
+    criterion = serializers.ChoiceField(
+        choices=("earliest", "fewest_legs", "shortest"),
+        default="earliest",
+        help_text="Earliest arrival, fewest legs or shortest distance",
+    )
+    min_connection = serializers.IntegerField(
+        default=45,
+        min_value=0,
+        help_text="Minimum connection time in minutes",
+    )
+    max_connection = serializers.IntegerField(
+        default=24 * 60,
+        min_value=1,
+        help_text="Maximum connection time in minutes",
+    )
+    max_legs = serializers.IntegerField(
+        default=3,
+        min_value=1,
+        max_value=5,
+    )
+
+
+class ConnectionLegSerializer(FlightSerializer):
+    source = serializers.CharField(
+        source="route.source",
+        read_only=True,
+    )
+    destination = serializers.CharField(
+        source="route.destination",
+        read_only=True,
+    )
+    distance = serializers.IntegerField(
+        source="route.distance",
+        read_only=True,
+    )
+
+    class Meta:
+        model = Flight
+        fields = (
+            "id",
+            "source",
+            "destination",
+            "departure_time",
+            "arrival_time",
+            "distance",
+        )
+
+
+class ConnectionSerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    distance = serializers.IntegerField(read_only=True)
+    legs = ConnectionLegSerializer(many=True, read_only=True)
+
+
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
@@ -252,7 +537,105 @@ class RouteDetailSerializer(RouteSerializer):
     )
 
 
+class TicketFlightField(serializers.PrimaryKeyRelatedField):
+    preloaded = None
+
+    def to_internal_value(self, data):
+        if self.preloaded is not None and not isinstance(data, bool):
+            try:
+                return self.preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return super().to_internal_value(data)
+
+
+class TicketBulkSerializer(serializers.ListSerializer):
+    """
+    Validates a batch of tickets with one flight lookup and one query
+    each for sold and held seats instead of a few queries per ticket.
+    """
+
+    def to_internal_value(self, data):
+        flight_field = self.child.fields.get("flight")
+
+        if isinstance(data, list) and isinstance(
+            flight_field, TicketFlightField
+        ):
+            flight_ids = set()
+            for item in data:
+                try:
+                    flight_ids.add(int(item["flight"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            flight_field.preloaded = Flight.objects.select_related(
+                "airplane"
+            ).in_bulk(flight_ids)
+
+        attrs = super().to_internal_value(data)
+        self.validate_seats_are_free(attrs)
+        return attrs
+
+    def validate_seats_are_free(self, attrs):
+        if not attrs:
+            return
+
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs
+        ]
+        flight_ids, rows, seat_numbers = map(set, zip(*seats))
+        taken_seats = set(
+            Ticket.objects.filter(
+                flight_id__in=flight_ids,
+                row__in=rows,
+                seat__in=seat_numbers,
+            ).values_list("flight_id", "row", "seat")
+        )
+
+        request = self.context.get("request")
+        holds = SeatHold.objects.filter(
+            flight_id__in=flight_ids,
+            row__in=rows,
+            seat__in=seat_numbers,
+            expires_at__gt=timezone.now(),
+        )
+        if request is not None:
+            holds = holds.exclude(user=request.user)
+        held_seats = set(holds.values_list("flight_id", "row", "seat"))
+
+        errors = []
+        for seat in seats:
+            if seat in taken_seats:
+                errors.append(
+                    {
+                        "non_field_errors": [
+                            "The fields row, seat, flight "
+                            "must make a unique set."
+                        ]
+                    }
+                )
+            elif seat in held_seats:
+                errors.append(
+                    {
+                        "non_field_errors": [
+                            "The seat is held by another customer."
+                        ]
+                    }
+                )
+            else:
+                errors.append({})
+            taken_seats.add(seat)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = TicketFlightField(
+        queryset=Flight.objects.select_related("airplane"),
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
         Ticket.validate_ticket(
@@ -271,6 +654,10 @@ class TicketSerializer(serializers.ModelSerializer):
             "seat",
             "flight",
         )
+        # seat conflicts are checked for the whole batch
+        # by TicketBulkSerializer
+        validators = []
+        list_serializer_class = TicketBulkSerializer
 
 
 class TicketListSerializer(TicketSerializer):
@@ -298,11 +685,7 @@ class FlightDetailSerializer(FlightSerializer):
         many=False,
         read_only=True,
     )
-    taken_seats = TicketTakenSeatsSerializer(
-        source="tickets",
-        many=True,
-        read_only=True,
-    )
+    taken_seats = serializers.SerializerMethodField()
 
     class Meta:
         model = Flight
@@ -315,6 +698,74 @@ class FlightDetailSerializer(FlightSerializer):
             "taken_seats",
         )
 
+    @extend_schema_field(TicketTakenSeatsSerializer(many=True))
+    def get_taken_seats(self, obj):
+        if "tickets" in getattr(obj, "_prefetched_objects_cache", {}):
+            seats = ((ticket.row, ticket.seat) for ticket in obj.tickets.all())
+        else:
+            seats = obj.tickets.values_list("row", "seat")
+
+        return [{"row": row, "seat": seat} for row, seat in seats]
+
+
+class FlightSeatMapSerializer(serializers.ModelSerializer):
+    rows = serializers.IntegerField(
+        source="airplane.rows",
+        read_only=True,
+    )
+    seats_in_row = serializers.IntegerField(
+        source="airplane.seats_in_row",
+        read_only=True,
+    )
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Flight
+        fields = (
+            "id",
+            "rows",
+            "seats_in_row",
+            "seat_map",
+        )
+
+    def get_seat_map(self, obj) -> str:
+        return base64.b64encode(obj.get_seat_map()).decode()
+
+
+class SeatHoldBulkSerializer(TicketBulkSerializer):
+    def create(self, validated_data):
+        try:
+            return SeatHold.place(self.context["request"].user, validated_data)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(
+                {"non_field_errors": exc.messages}
+            )
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        "Some of the seats have just been held."
+                    ]
+                }
+            )
+
+
+class SeatHoldSerializer(TicketSerializer):
+    class Meta:
+        model = SeatHold
+        fields = (
+            "id",
+            "row",
+            "seat",
+            "flight",
+            "expires_at",
+        )
+        read_only_fields = ("expires_at",)
+        # seat conflicts are checked for the whole batch
+        # by SeatHoldBulkSerializer
+        validators = []
+        list_serializer_class = SeatHoldBulkSerializer
+
 
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(
@@ -332,15 +783,59 @@ class OrderSerializer(serializers.ModelSerializer):
             "tickets",
         )
 
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if not (request and request.user.is_staff):
+            # customers may not mark their own orders paid
+            fields["paid"].read_only = True
+        return fields
+
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
+            try:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(
+                        Ticket(order=order, **ticket_data)
+                        for ticket_data in tickets_data
+                    )
+            except IntegrityError:
+                raise serializers.ValidationError(
+                    {"tickets": ["Some of the seats have just been sold."]}
+                )
+            SeatHold.release(order.user, tickets_data)
+
+            seats_by_flight = defaultdict(list)
             for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+                seats_by_flight[ticket_data["flight"].id].append(
+                    (ticket_data["row"], ticket_data["seat"])
+                )
+            # lock the flights in id order, so that concurrent orders
+            # of the same flights cannot deadlock
+            for flight_id in sorted(seats_by_flight):
+                Flight.update_occupancy(flight_id, seats_by_flight[flight_id])
+
             return order
 
 
+class OrderExportSerializer(serializers.Serializer):
+    created_after = serializers.DateField(
+        required=False,
+        help_text="Earliest order date, inclusive (ex. 2023-09-01)",
+    )
+    created_before = serializers.DateField(
+        required=False,
+        help_text="Latest order date, inclusive (ex. 2023-09-30)",
+    )
+    paid = serializers.BooleanField(
+        allow_null=True,
+        default=None,
+        help_text="Only paid or only unpaid orders",
+    )
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(
         many=True,
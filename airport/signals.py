@@ -0,0 +1,140 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from airport.cache import invalidate_response_cache
+from airport.images import schedule_variants
+from airport.metrics import install_execute_wrapper, record_queries
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Facility,
+    Flight,
+    Route,
+    Ticket,
+)
+from airport.query_inspection import inspect_queries
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance, **kwargs):
+    instance._previous_seat = None
+    if instance.pk:
+        instance._previous_seat = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("flight_id", "row", "seat")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, created, **kwargs):
+    previous_seat = getattr(instance, "_previous_seat", None)
+    if previous_seat:
+        flight_id, row, seat = previous_seat
+        Flight.update_occupancy(flight_id, [(row, seat)], taken=False)
+
+    Flight.update_occupancy(
+        instance.flight_id, [(instance.row, instance.seat)]
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    Flight.update_occupancy(
+        instance.flight_id, [(instance.row, instance.seat)], taken=False
+    )
+
+
+@receiver(pre_save, sender=Flight)
+def remember_flight_airplane(sender, instance, **kwargs):
+    instance._previous_airplane_id = None
+    if instance.pk:
+        instance._previous_airplane_id = (
+            Flight.objects.filter(pk=instance.pk)
+            .values_list("airplane_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Flight)
+def rebuild_flight_occupancy(sender, instance, created, **kwargs):
+    previous_airplane_id = getattr(instance, "_previous_airplane_id", None)
+    if previous_airplane_id and previous_airplane_id != instance.airplane_id:
+        Flight.rebuild_occupancy(
+            Flight.objects.select_related("airplane").filter(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Airplane)
+def rebuild_airplane_occupancy(sender, instance, created, **kwargs):
+    if not created:
+        Flight.rebuild_occupancy(
+            Flight.objects.select_related("airplane").filter(airplane=instance)
+        )
+
+
+@receiver(pre_save, sender=Airport)
+@receiver(pre_save, sender=AirplaneType)
+def remember_image_variants(sender, instance, **kwargs):
+    instance._previous_image = None
+    if instance.pk:
+        instance._previous_image = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("image", "image_variants")
+            .first()
+        )
+
+    image = instance.image
+    instance._image_changed = not (
+        instance._previous_image
+        and instance._previous_image[0] == image.name
+        and image._committed
+    )
+    if instance._image_changed:
+        # a new image: its variants are generated after save
+        instance.image_variants = {}
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=AirplaneType)
+def generate_image_variants(sender, instance, **kwargs):
+    if not instance.image or not getattr(instance, "_image_changed", False):
+        return
+
+    previous = instance._previous_image
+    if previous and previous[0] == instance.image.name and previous[1]:
+        # the same content uploaded again is stored under the same name
+        instance.image_variants = previous[1]
+        sender.objects.filter(pk=instance.pk).update(
+            image_variants=previous[1]
+        )
+        return
+
+    schedule_variants(sender, instance.pk, instance.image.name)
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_reference_data(sender, **kwargs):
+    invalidate_response_cache(sender)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def invalidate_flights(sender, **kwargs):
+    # reloads the connection graph of every process on its next search
+    invalidate_response_cache(sender)
+
+
+@receiver(connection_created)
+def install_query_wrappers(sender, connection, **kwargs):
+    install_execute_wrapper(connection, record_queries)
+    install_execute_wrapper(connection, inspect_queries)
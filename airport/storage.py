@@ -0,0 +1,71 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.crypto import get_random_string
+from django.utils.deconstruct import deconstructible
+
+# name of a stored blob: <upload_to>/<2 hex digits>/<sha256>.<extension>
+BLOB_NAME = re.compile(r"(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}(?:\.[\w]+)?$")
+
+# suffix of a blob being written, renamed into place once complete
+TEMPORARY_SUFFIX = ".tmp"
+
+
+def is_blob(name):
+    return BLOB_NAME.search(name) is not None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming every file by the SHA-256 of its content.
+
+    The same content is always stored once, under the same name, so a
+    repeated upload costs no space and the URL of a file never changes
+    content, which lets it be cached forever (see
+    ``airport_api.media``). A file is written under a temporary name and
+    renamed into place, so a blob is either complete or absent. Blobs
+    may be shared by rows and are never deleted by them; the
+    collect_media_garbage command deletes the unreferenced ones.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # the final name depends on the content only, see _save
+        return name
+
+    def blob_name(self, name, content):
+        """``name`` with its file name replaced by the content hash."""
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+
+        directory, file_name = posixpath.split(name)
+        extension = posixpath.splitext(file_name)[1].lower()
+        digest = digest.hexdigest()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        name = self.blob_name(name, content)
+        if self.exists(name):
+            # a fresh modification time keeps the blob from being
+            # collected before the row referencing it again is saved
+            os.utime(self.path(name))
+            return name
+
+        temporary = super()._save(
+            f"{name}.{get_random_string(12)}{TEMPORARY_SUFFIX}", content
+        )
+        # identical content may have been renamed into place meanwhile,
+        # which makes overwriting it harmless
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+content_addressed_storage = ContentAddressedStorage()
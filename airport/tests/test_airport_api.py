@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -100,3 +101,74 @@ class AdminAirportTests(TestCase):
         url = detail_url(airport.id)
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class AirportResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_conditional_get_returns_not_modified(self):
+        sample_airport()
+        res = self.client.get(AIRPORT_URL)
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_response_served_without_queries(self):
+        airport = sample_airport()
+        self.client.get(detail_url(airport.id))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(detail_url(airport.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["name"], "Test")
+
+    def test_change_invalidates_cached_response(self):
+        airport = sample_airport()
+        first = self.client.get(AIRPORT_URL)
+
+        airport.name = "Changed"
+        airport.save()
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+        self.assertEqual(res.data[0]["name"], "Changed")
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_cached_response_built_from_primary(self):
+        # replica_0 is not a configured database, so any read from it fails
+        sample_airport()
+
+        res = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["name"], "Test")
+
+    @override_settings(ALLOWED_HOSTS=["internal", "api.example.com"])
+    def test_cached_response_keyed_by_host(self):
+        airport = sample_airport()
+        Airport.objects.filter(pk=airport.pk).update(
+            image="images/airport/test.jpg"
+        )
+        internal = self.client.get(AIRPORT_URL, HTTP_HOST="internal")
+
+        res = self.client.get(
+            AIRPORT_URL, HTTP_HOST="api.example.com", secure=True
+        )
+
+        self.assertNotEqual(res["ETag"], internal["ETag"])
+        self.assertTrue(
+            res.data[0]["image"].startswith("https://api.example.com/")
+        )
@@ -0,0 +1,127 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.autocomplete import airport_index, prefix_distance
+from airport.tests.test_airport_api import sample_airport
+
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
+
+
+class UnauthenticatedAirportAutocompleteApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "lon"})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedAirportAutocompleteApiTest(TestCase):
+    def setUp(self):
+        airport_index.invalidate()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.heathrow = sample_airport(
+            name="Heathrow", closest_big_city="London", country="UK"
+        )
+        self.gatwick = sample_airport(
+            name="Gatwick", closest_big_city="London", country="UK"
+        )
+        self.london_city = sample_airport(
+            name="London City", closest_big_city="London", country="UK"
+        )
+        self.guarulhos = sample_airport(
+            name="Guarulhos",
+            closest_big_city="São Paulo",
+            country="Brazil",
+        )
+
+    def search(self, q, **params):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": q, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [airport["id"] for airport in res.data]
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"])
+    def test_index_loaded_from_primary(self):
+        # replica_0 is not a configured database, so any read from it fails
+        self.assertEqual(self.search("heat"), [self.heathrow.id])
+
+    def test_prefix_of_any_field(self):
+        self.assertEqual(self.search("heat"), [self.heathrow.id])
+        self.assertEqual(self.search("braz"), [self.guarulhos.id])
+        self.assertEqual(
+            set(self.search("lon")),
+            {self.heathrow.id, self.gatwick.id, self.london_city.id},
+        )
+
+    def test_name_matches_rank_first(self):
+        self.assertEqual(self.search("lon")[0], self.london_city.id)
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search("london gat"), [self.gatwick.id])
+        self.assertEqual(self.search("london braz"), [])
+
+    def test_accents_and_case_are_ignored(self):
+        self.assertEqual(self.search("SAO PAU"), [self.guarulhos.id])
+
+    def test_typos(self):
+        self.assertEqual(self.search("heatrow"), [self.heathrow.id])
+        self.assertEqual(self.search("gatwik"), [self.gatwick.id])
+        self.assertEqual(self.search("guralhos"), [self.guarulhos.id])
+
+    def test_short_words_need_exact_prefix(self):
+        self.assertEqual(self.search("gy"), [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.search("lon", limit=2)), 2)
+
+    def test_response_fields(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "guarulhos"})
+
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": self.guarulhos.id,
+                    "name": "Guarulhos",
+                    "closest_big_city": "São Paulo",
+                    "country": "Brazil",
+                }
+            ],
+        )
+
+    def test_invalid_params(self):
+        for params in ({}, {"q": "lon", "limit": 0}):
+            with self.subTest(params):
+                res = self.client.get(AUTOCOMPLETE_URL, params)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_changes(self):
+        self.search("lon")
+
+        self.gatwick.name = "Stansted"
+        self.gatwick.save()
+        self.heathrow.delete()
+        luton = sample_airport(
+            name="Luton", closest_big_city="London", country="UK"
+        )
+
+        self.assertEqual(self.search("stan"), [self.gatwick.id])
+        self.assertEqual(self.search("gatw"), [])
+        self.assertEqual(
+            set(self.search("lon")),
+            {self.gatwick.id, self.london_city.id, luton.id},
+        )
+
+    def test_prefix_distance(self):
+        self.assertEqual(prefix_distance("lodn", "london", 2), 1)
+        self.assertEqual(prefix_distance("lond", "london", 2), 0)
+        self.assertEqual(prefix_distance("xyz", "london", 1), 2)
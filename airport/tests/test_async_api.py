@@ -0,0 +1,136 @@
+from asgiref.sync import AsyncToSync, SyncToAsync
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Flight, Order, Ticket
+from airport.tests.test_flight_api import sample_flight
+
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+ASYNC_ROUTE_URL = reverse("airport:async-route-list")
+
+
+def detail_url(flight_id):
+    return reverse("airport:async-flight-detail", args=[flight_id])
+
+
+def seatmap_url(flight_id):
+    return reverse("airport:async-flight-seatmap", args=[flight_id])
+
+
+class UnauthenticatedAsyncApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(ASYNC_FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", res)
+
+    def test_invalid_token(self):
+        res = self.client.get(ASYNC_FLIGHT_URL, HTTP_AUTHORIZATION="Bearer invalid")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedAsyncApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+
+    def assert_same_response(self, sync_url, async_url):
+        sync_res = self.client.get(sync_url)
+        async_res = self.client.get(async_url)
+
+        self.assertEqual(async_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_res.json(), sync_res.json())
+
+    def test_list_flights(self):
+        self.assert_same_response(reverse("airport:flight-list"), ASYNC_FLIGHT_URL)
+
+    def test_list_flights_with_cursor(self):
+        self.assert_same_response(
+            reverse("airport:flight-list") + "?cursor=",
+            ASYNC_FLIGHT_URL + "?cursor=",
+        )
+
+    def test_retrieve_flight(self):
+        self.assert_same_response(
+            reverse("airport:flight-detail", args=[self.flight.id]),
+            detail_url(self.flight.id),
+        )
+
+    def test_flight_seatmap(self):
+        self.assert_same_response(
+            reverse("airport:flight-seatmap", args=[self.flight.id]),
+            seatmap_url(self.flight.id),
+        )
+
+    def test_flight_seatmap_rebuilt_from_tickets(self):
+        # e.g. a bulk-created flight without a packed map
+        Flight.objects.filter(pk=self.flight.pk).update(seat_map=b"")
+
+        self.assert_same_response(
+            reverse("airport:flight-seatmap", args=[self.flight.id]),
+            seatmap_url(self.flight.id),
+        )
+
+    def test_list_routes(self):
+        self.assert_same_response(reverse("airport:route-list"), ASYNC_ROUTE_URL)
+
+    def test_retrieve_unknown_flight(self):
+        res = self.client.get(detail_url(999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_page(self):
+        res = self.client.get(ASYNC_FLIGHT_URL + "?page=2")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_method_not_allowed(self):
+        res = self.client.post(ASYNC_FLIGHT_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_served_by_asgi_handler(self):
+        token = AccessToken.for_user(self.user)
+
+        res = await self.async_client.get(
+            ASYNC_FLIGHT_URL, AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"][0]["id"], self.flight.id)
+
+
+class AsgiMiddlewareChainTest(SimpleTestCase):
+    def test_middleware_not_adapted(self):
+        # every middleware runs natively in async mode, so no layer of
+        # the chain hops to a thread and back
+        handler = ASGIHandler()._middleware_chain
+        chain = []
+        while handler is not None:
+            chain.append(handler)
+            handler = getattr(handler, "__wrapped__", None) or getattr(
+                handler, "get_response", None
+            )
+
+        self.assertEqual(
+            [layer for layer in chain if isinstance(layer, (SyncToAsync, AsyncToSync))],
+            [],
+        )
+        # the walk reached the end of the chain
+        self.assertEqual(chain[-1].__name__, "_get_response_async")
@@ -0,0 +1,215 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.cache import invalidate_response_cache
+from airport.connections import connection_graph
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+
+CONNECTION_URL = reverse("airport:connection-list")
+# the graph only holds flights that have not left long ago
+DAY = timezone.now().date() + timedelta(days=7)
+
+
+def at(time, days=0):
+    return f"{DAY + timedelta(days=days)}T{time}:00"
+
+
+def sample_airport(name):
+    return Airport.objects.create(name=name, closest_big_city=name, country="Test")
+
+
+def sample_flight(route, airplane, departure, arrival):
+    return Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time=at(departure),
+        arrival_time=at(arrival),
+    )
+
+
+class UnauthenticatedConnectionApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(CONNECTION_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedConnectionApiTest(TestCase):
+    def setUp(self):
+        connection_graph.invalidate()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.a, self.b, self.c, self.d = (
+            sample_airport(name) for name in ("A", "B", "C", "D")
+        )
+        self.airplane = Airplane.objects.create(
+            name="Test",
+            rows=10,
+            seats_in_row=10,
+            airplane_type=AirplaneType.objects.create(name="Test"),
+        )
+
+        def route(source, destination, distance):
+            return Route.objects.create(
+                source=source, destination=destination, distance=distance
+            )
+
+        self.a_b = sample_flight(
+            route(self.a, self.b, 100), self.airplane, "08:00", "09:00"
+        )
+        self.b_d = sample_flight(
+            route(self.b, self.d, 100), self.airplane, "10:00", "11:00"
+        )
+        self.a_c = sample_flight(
+            route(self.a, self.c, 50), self.airplane, "07:00", "08:00"
+        )
+        self.c_d = sample_flight(
+            route(self.c, self.d, 50), self.airplane, "09:00", "13:00"
+        )
+        self.a_d = sample_flight(
+            route(self.a, self.d, 1000), self.airplane, "09:00", "14:00"
+        )
+
+    def search(self, **params):
+        defaults = {
+            "source": self.a.id,
+            "destination": self.d.id,
+            "departure_time": at("00:00"),
+        }
+        defaults.update(params)
+        return self.client.get(CONNECTION_URL, defaults)
+
+    def leg_ids(self, res):
+        return [leg["id"] for leg in res.data["legs"]]
+
+    def test_earliest_arrival(self):
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.leg_ids(res), [self.a_b.id, self.b_d.id])
+        self.assertEqual(res.data["distance"], 200)
+        self.assertEqual(res.data["legs"][0]["source"], "A")
+        self.assertEqual(res.data["legs"][1]["destination"], "D")
+
+    def test_fewest_legs(self):
+        res = self.search(criterion="fewest_legs")
+
+        self.assertEqual(self.leg_ids(res), [self.a_d.id])
+
+    def test_shortest_distance(self):
+        res = self.search(criterion="shortest")
+
+        self.assertEqual(self.leg_ids(res), [self.a_c.id, self.c_d.id])
+        self.assertEqual(res.data["distance"], 100)
+
+    def test_minimum_connection_time(self):
+        res = self.search(min_connection=90)
+
+        self.assertEqual(self.leg_ids(res), [self.a_d.id])
+
+    def test_no_connection(self):
+        res = self.search(source=self.d.id, destination=self.a.id)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_graph_follows_flight_changes(self):
+        self.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            faster = sample_flight(self.a_d.route, self.airplane, "07:30", "08:30")
+        self.assertEqual(self.leg_ids(self.search()), [faster.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            faster.delete()
+        self.assertEqual(self.leg_ids(self.search()), [self.a_b.id, self.b_d.id])
+
+    def test_graph_follows_other_processes(self):
+        self.search()
+        # inserted by another process: no signal reaches this one
+        (faster,) = Flight.objects.bulk_create(
+            [
+                Flight(
+                    route=self.a_d.route,
+                    airplane=self.airplane,
+                    departure_time=at("07:30"),
+                    arrival_time=at("08:30"),
+                )
+            ]
+        )
+
+        invalidate_response_cache(Flight)
+
+        self.assertEqual(self.leg_ids(self.search()), [faster.id])
+
+    def test_graph_refreshes_changed_flights_only(self):
+        self.search()
+        self.a_d.departure_time = at("07:00")
+        self.a_d.arrival_time = at("08:00")
+
+        with mock.patch.object(
+            connection_graph, "invalidate", wraps=connection_graph.invalidate
+        ) as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.a_d.save()
+            res = self.search()
+
+        invalidate.assert_not_called()
+        self.assertEqual(self.leg_ids(res), [self.a_d.id])
+
+    def test_graph_reloads_once_deleted_flight_found(self):
+        self.search()
+        # refreshes only pick up updated flights, not deleted ones
+        with self.captureOnCommitCallbacks(execute=True):
+            self.a_b.delete()
+
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.leg_ids(res), [self.a_c.id, self.c_d.id])
+
+    def test_departed_flights_not_loaded(self):
+        Flight.objects.create(
+            route=self.a_d.route,
+            airplane=self.airplane,
+            departure_time=timezone.now() - timedelta(days=2),
+            arrival_time=timezone.now() - timedelta(days=2, hours=-1),
+        )
+
+        res = self.search(departure_time=timezone.now() - timedelta(days=3))
+
+        self.assertEqual(self.leg_ids(res), [self.a_b.id, self.b_d.id])
+
+    def test_first_flight_after_max_connection(self):
+        res = self.search(departure_time=at("00:00", days=-4))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.leg_ids(res), [self.a_b.id, self.b_d.id])
+
+    def test_later_arrival_catches_connection_out_of_reach(self):
+        e = sample_airport("E")
+        later = sample_flight(self.a_b.route, self.airplane, "10:00", "11:00")
+        next_day = Flight.objects.create(
+            route=Route.objects.create(source=self.b, destination=e, distance=100),
+            airplane=self.airplane,
+            departure_time=at("10:30", days=1),
+            arrival_time=at("11:30", days=1),
+        )
+
+        res = self.search(destination=e.id, max_connection=24 * 60)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.leg_ids(res), [later.id, next_day.id])
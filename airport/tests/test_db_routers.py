@@ -0,0 +1,107 @@
+from asgiref.sync import iscoroutinefunction
+from django.db import router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from airport.models import Flight
+from airport_api.db_routers import ReplicaRoutingMiddleware, read_from_primary
+
+
+def read_database():
+    return router.db_for_read(Flight)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def databases_used(self, request):
+        used = {}
+
+        def get_response(request):
+            used["read"] = read_database()
+            used["write"] = router.db_for_write(Flight)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(get_response)(request)
+        return used
+
+    def test_safe_requests_read_from_replica(self):
+        for method in ("get", "head", "options"):
+            with self.subTest(method):
+                used = self.databases_used(getattr(self.factory, method)("/"))
+                self.assertEqual(
+                    used, {"read": "replica_0", "write": "default"}
+                )
+
+    def test_unsafe_requests_use_primary(self):
+        for method in ("post", "put", "patch", "delete"):
+            with self.subTest(method):
+                used = self.databases_used(getattr(self.factory, method)("/"))
+                self.assertEqual(used, {"read": "default", "write": "default"})
+
+    def test_read_from_primary_inside_request(self):
+        def get_response(request):
+            with read_from_primary():
+                used["primary"] = read_database()
+            used["replica"] = read_database()
+            return HttpResponse()
+
+        used = {}
+        ReplicaRoutingMiddleware(get_response)(self.factory.get("/"))
+
+        self.assertEqual(used, {"primary": "default", "replica": "replica_0"})
+
+    def test_primary_outside_requests(self):
+        self.databases_used(self.factory.get("/"))
+
+        self.assertEqual(read_database(), "default")
+
+    def test_streaming_content_reads_from_replica(self):
+        def content():
+            for _ in range(2):
+                yield read_database()
+
+        response = ReplicaRoutingMiddleware(
+            lambda request: StreamingHttpResponse(content())
+        )(self.factory.get("/"))
+
+        self.assertEqual(b"".join(response.streaming_content), b"replica_0" * 2)
+        self.assertEqual(read_database(), "default")
+
+    async def test_async_requests_read_from_replica(self):
+        used = {}
+
+        async def get_response(request):
+            used["read"] = read_database()
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(self.factory.get("/"))
+
+        self.assertEqual(used, {"read": "replica_0"})
+        self.assertEqual(read_database(), "default")
+
+    async def test_async_streaming_content_reads_from_replica(self):
+        async def content():
+            for _ in range(2):
+                yield read_database()
+
+        async def get_response(request):
+            return StreamingHttpResponse(content())
+
+        response = await ReplicaRoutingMiddleware(get_response)(
+            self.factory.get("/")
+        )
+
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(b"".join(chunks), b"replica_0" * 2)
+        self.assertEqual(read_database(), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        used = self.databases_used(self.factory.get("/"))
+
+        self.assertEqual(used, {"read": "default", "write": "default"})
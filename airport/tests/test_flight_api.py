@@ -1,20 +1,40 @@
+import base64
+from io import StringIO
+from unittest import skipUnless
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from airport.models import Flight, Route, Airplane, AirplaneType, Airport
+from airport.models import (
+    Flight,
+    Order,
+    Route,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Ticket,
+)
 from airport.serializers import FlightDetailSerializer
 
 FLIGHT_URL = reverse("airport:flight-list")
+FLIGHT_SEARCH_URL = reverse("airport:flight-search")
 
 
 def detail_url(flight_id: int):
     return reverse("airport:flight-detail", args=[flight_id])
 
 
-def sample_flight(**params):
+def seatmap_url(flight_id: int):
+    return reverse("airport:flight-seatmap", args=[flight_id])
+
+
+def sample_flight(rows=10, **params):
     airport = Airport.objects.create(
         name="Test", closest_big_city="Test", country="Test"
     )
@@ -27,7 +47,7 @@ def sample_flight(**params):
     airplane_type = AirplaneType.objects.create(name="Test")
     airplane = Airplane.objects.create(
         name="Test",
-        rows=10,
+        rows=rows,
         seats_in_row=10,
         airplane_type=airplane_type,
     )
@@ -78,6 +98,213 @@ class AuthenticatedFlightTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_retrieve_flight_detail_taken_seats(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=2, seat=3, flight=flight, order=order)
+        Ticket.objects.create(row=1, seat=5, flight=flight, order=order)
+
+        with self.assertNumQueries(4):
+            res = self.client.get(detail_url(flight.id))
+
+        self.assertEqual(
+            res.data["taken_seats"],
+            [{"row": 1, "seat": 5}, {"row": 2, "seat": 3}],
+        )
+
+    def test_retrieve_flight_seatmap(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=2, seat=10, flight=flight, order=order)
+
+        res = self.client.get(seatmap_url(flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["rows"], 10)
+        self.assertEqual(res.data["seats_in_row"], 10)
+        seat_map = base64.b64decode(res.data["seat_map"])
+        self.assertEqual(len(seat_map), 13)
+        self.assertEqual(seat_map[0], 0b10000000)
+        self.assertEqual(seat_map[2], 0b00010000)
+        self.assertEqual(sum(bin(byte).count("1") for byte in seat_map), 2)
+
+    def test_seatmap_follows_order_creation_and_deletion(self):
+        flight = sample_flight()
+
+        res = self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 3, "seat": 4, "flight": flight.id}]},
+            format="json",
+        )
+        flight.refresh_from_db()
+        self.assertTrue(flight.is_seat_taken(3, 4))
+        self.assertFalse(flight.is_seat_taken(4, 3))
+
+        Order.objects.get(id=res.data["id"]).delete()
+        flight.refresh_from_db()
+        self.assertFalse(flight.is_seat_taken(3, 4))
+
+    def test_list_flight_tickets_available(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 98)
+
+    def test_reconcile_flight_occupancy(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=5, seat=5, flight=flight, order=order)
+        Flight.objects.filter(pk=flight.pk).update(seat_map=b"", seats_sold=7)
+
+        out = StringIO()
+        call_command("reconcile_flight_occupancy", stdout=out)
+
+        flight.refresh_from_db()
+        self.assertEqual(flight.seats_sold, 1)
+        self.assertTrue(flight.is_seat_taken(5, 5))
+        self.assertIn("fixed 1", out.getvalue())
+
+    def test_list_flights_with_cursor(self):
+        first = sample_flight()
+        for day in range(6, 30):
+            Flight.objects.create(
+                route=first.route,
+                airplane=first.airplane,
+                departure_time=f"2023-09-{day:02d}T18:00:00",
+                arrival_time=f"2023-09-{day:02d}T19:00:00",
+            )
+        Flight.objects.create(
+            route=first.route,
+            airplane=first.airplane,
+            departure_time="2023-09-29T18:00:00",
+            arrival_time="2023-09-29T19:00:00",
+        )
+        expected = list(
+            Flight.objects.order_by("-departure_time", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+        seen = []
+        url = FLIGHT_URL + "?cursor="
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            self.assertFalse(
+                any("COUNT(" in query["sql"] for query in queries.captured_queries)
+            )
+            seen.extend(flight["id"] for flight in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(seen, expected)
+
+        res = self.client.get(FLIGHT_URL + "?cursor=")
+        res = self.client.get(res.data["next"])
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]], expected[:10]
+        )
+        self.assertIsNone(res.data["previous"])
+
+    def test_list_flights_with_invalid_cursor(self):
+        res = self.client.get(FLIGHT_URL + "?cursor=invalid")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_flights_with_null_cursor(self):
+        cursor = base64.urlsafe_b64encode(b"[null, 1, 0]").decode()
+
+        res = self.client.get(FLIGHT_URL, {"cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_flights(self):
+        flight = sample_flight()
+        other_airport = Airport.objects.create(
+            name="Other", closest_big_city="Other", country="Other"
+        )
+        other_route = Route.objects.create(
+            source=flight.route.source,
+            destination=other_airport,
+            distance=500,
+        )
+        later_flight = Flight.objects.create(
+            route=flight.route,
+            airplane=flight.airplane,
+            departure_time="2023-09-07T18:00:00",
+            arrival_time="2023-09-07T19:00:00",
+        )
+        Flight.objects.create(
+            route=other_route,
+            airplane=flight.airplane,
+            departure_time="2023-09-05T10:00:00",
+            arrival_time="2023-09-05T11:00:00",
+        )
+        Flight.objects.filter(pk=later_flight.pk).update(seats_sold=95)
+
+        res = self.client.get(
+            FLIGHT_SEARCH_URL,
+            {
+                "source": flight.route.source_id,
+                "destination": flight.route.destination_id,
+                "departure_after": "2023-09-05",
+                "departure_before": "2023-09-07",
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["id"] for result in res.data["results"]],
+            [later_flight.id, flight.id],
+        )
+
+        res = self.client.get(
+            FLIGHT_SEARCH_URL,
+            {"destination": flight.route.destination_id, "min_seats": 10},
+        )
+        self.assertEqual([result["id"] for result in res.data["results"]], [flight.id])
+
+        res = self.client.get(FLIGHT_SEARCH_URL, {"departure_before": "2023-09-05"})
+        self.assertEqual(res.data["count"], 2)
+
+    def test_search_flights_invalid_params(self):
+        res = self.client.get(FLIGHT_SEARCH_URL, {"min_seats": 0})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipUnless(connection.vendor == "sqlite", "reads an SQLite query plan")
+    def test_search_flights_uses_composite_indexes(self):
+        flight = sample_flight()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                FLIGHT_SEARCH_URL,
+                {
+                    "source": flight.route.source_id,
+                    "destination": flight.route.destination_id,
+                    "departure_after": "2023-09-01",
+                },
+            )
+        search_sql = next(
+            query["sql"]
+            for query in queries.captured_queries
+            if "departure_time" in query["sql"] and "COUNT(" not in query["sql"]
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {search_sql}")
+            plan = " ".join(str(row) for row in cursor.fetchall())
+
+        self.assertIn("flight_route_departure_idx", plan)
+        self.assertIn("route_source_destination_idx", plan)
+
     def test_create_flight_forbidden(self):
         airport = Airport.objects.create(
             name="Test", closest_big_city="Test", country="Test"
@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+
+FLIGHT_IMPORT_URL = reverse("airport:flight-import-schedule")
+
+
+def csv_schedule(rows):
+    lines = ["route,source,destination,airplane,departure_time,arrival_time"]
+    lines += [",".join(str(value) for value in row) for row in rows]
+    return "\n".join(lines) + "\n"
+
+
+class FlightImportTestMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+        self.kyiv, self.lviv = (
+            Airport.objects.create(name=name, closest_big_city=name, country="UA")
+            for name in ("Kyiv", "Lviv")
+        )
+        self.route = Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=500
+        )
+        self.airplane = Airplane.objects.create(
+            name="Test",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Test"),
+        )
+
+    def row(self, day=5, airplane=None, route=None):
+        return (
+            route or self.route.id,
+            "",
+            "",
+            airplane or self.airplane.id,
+            f"2023-09-{day:02}T18:00:00",
+            f"2023-09-{day:02}T19:00:00",
+        )
+
+
+class FlightImportApiTest(FlightImportTestMixin, TestCase):
+    def test_import_requires_admin(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.post(
+            FLIGHT_IMPORT_URL,
+            csv_schedule([self.row()]),
+            content_type="text/csv",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_csv(self):
+        schedule = csv_schedule([self.row(5), self.row(6, airplane=999), self.row(7)])
+
+        res = self.client.post(FLIGHT_IMPORT_URL, schedule, content_type="text/csv")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["failed"], 1)
+        self.assertEqual(res.data["errors"][0]["line"], 3)
+        self.assertIn("airplane", res.data["errors"][0]["errors"])
+
+        flight = Flight.objects.get(departure_time__day=5)
+        self.assertEqual(flight.route, self.route)
+        self.assertEqual(flight.tickets_available, 40)
+        self.assertEqual(bytes(flight.seat_map), bytes(5))
+
+    def test_import_ndjson(self):
+        lines = [
+            json.dumps(
+                {
+                    "source": self.kyiv.id,
+                    "destination": self.lviv.id,
+                    "airplane": self.airplane.id,
+                    "departure_time": "2023-09-05T18:00:00",
+                    "arrival_time": "2023-09-05T19:00:00",
+                }
+            ),
+            "",
+            "{not json",
+            json.dumps(
+                {
+                    "source": self.lviv.id,
+                    "destination": self.kyiv.id,
+                    "airplane": self.airplane.id,
+                    "departure_time": "2023-09-05T18:00:00",
+                    "arrival_time": "2023-09-05T17:00:00",
+                }
+            ),
+        ]
+
+        res = self.client.post(
+            FLIGHT_IMPORT_URL,
+            "\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(
+            [error["line"] for error in res.data["errors"]],
+            [3, 4],
+        )
+        self.assertIn("non_field_errors", res.data["errors"][0]["errors"])
+        self.assertIn("route", res.data["errors"][1]["errors"])
+
+    def test_import_arrival_before_departure(self):
+        row = list(self.row())
+        row[5] = "2023-09-05T17:00:00"
+
+        res = self.client.post(
+            FLIGHT_IMPORT_URL, csv_schedule([row]), content_type="text/csv"
+        )
+
+        self.assertEqual(res.data["created"], 0)
+        self.assertIn("arrival_time", res.data["errors"][0]["errors"])
+
+    def test_import_file(self):
+        schedule = SimpleUploadedFile(
+            "schedule.csv", csv_schedule([self.row()]).encode(), "text/csv"
+        )
+
+        res = self.client.post(
+            FLIGHT_IMPORT_URL, {"file": schedule}, format="multipart"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 1)
+
+    def test_import_file_with_unknown_format(self):
+        schedule = SimpleUploadedFile("schedule.txt", b"", "text/plain")
+
+        res = self.client.post(
+            FLIGHT_IMPORT_URL, {"file": schedule}, format="multipart"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        small = csv_schedule([self.row(day) for day in range(1, 3)])
+        large = csv_schedule([self.row(day) for day in range(1, 29)])
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.post(FLIGHT_IMPORT_URL, small, content_type="text/csv")
+        with CaptureQueriesContext(connection) as large_queries:
+            res = self.client.post(FLIGHT_IMPORT_URL, large, content_type="text/csv")
+
+        self.assertEqual(res.data["created"], 28)
+        self.assertEqual(len(small_queries), len(large_queries))
+
+
+class ImportFlightScheduleCommandTest(FlightImportTestMixin, TestCase):
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "schedule.csv")
+            with open(path, "w") as schedule:
+                schedule.write(csv_schedule([self.row(day) for day in range(1, 6)]))
+
+            out = StringIO()
+            call_command(
+                "import_flight_schedule",
+                path,
+                "--batch-size=2",
+                stdout=out,
+                stderr=StringIO(),
+            )
+
+        self.assertEqual(Flight.objects.count(), 5)
+        self.assertIn("Imported 5 flights", out.getvalue())
@@ -0,0 +1,200 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    FlightSchedule,
+    Order,
+    Route,
+    Ticket,
+)
+
+FLIGHT_SCHEDULE_URL = reverse("airport:flightschedule-list")
+
+
+def detail_url(schedule_id):
+    return reverse("airport:flightschedule-detail", args=[schedule_id])
+
+
+def sample_schedule(**params):
+    airport = Airport.objects.create(
+        name="Test", closest_big_city="Test", country="Test"
+    )
+    route = Route.objects.create(source=airport, destination=airport, distance=1000)
+    airplane = Airplane.objects.create(
+        name="Test",
+        rows=10,
+        seats_in_row=4,
+        airplane_type=AirplaneType.objects.create(name="Test"),
+    )
+
+    defaults = {
+        "route": route,
+        "airplane": airplane,
+        "days_of_week": "1234567",
+        "departure_time": time(23, 30),
+        "duration": timedelta(hours=2),
+        "valid_from": date.today(),
+    }
+    defaults.update(params)
+
+    return FlightSchedule.objects.create(**defaults)
+
+
+class FlightScheduleMaterializeTest(TestCase):
+    def test_materialize_daily_schedule(self):
+        schedule = sample_schedule()
+        today = date.today()
+
+        created = FlightSchedule.materialize(today + timedelta(days=6))
+
+        self.assertEqual(created, 7)
+        flight = schedule.flights.order_by("departure_time").first()
+        self.assertEqual(flight.departure_time, datetime.combine(today, time(23, 30)))
+        self.assertEqual(
+            flight.arrival_time - flight.departure_time, timedelta(hours=2)
+        )
+        self.assertEqual(flight.tickets_available, 40)
+
+    def test_materialize_days_of_week_and_validity(self):
+        today = date.today()
+        sample_schedule(
+            days_of_week=str(today.isoweekday()),
+            valid_until=today + timedelta(days=20),
+        )
+
+        created = FlightSchedule.materialize(today + timedelta(days=60))
+
+        self.assertEqual(created, 3)
+
+    def test_materialize_continues_from_last_run(self):
+        schedule = sample_schedule()
+        today = date.today()
+
+        FlightSchedule.materialize(today + timedelta(days=2))
+        self.assertEqual(FlightSchedule.materialize(today + timedelta(days=2)), 0)
+        self.assertEqual(FlightSchedule.materialize(today + timedelta(days=4)), 2)
+
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.generated_until, today + timedelta(days=4))
+        self.assertEqual(schedule.flights.count(), 5)
+
+    def test_reset_keeps_sold_flights(self):
+        schedule = sample_schedule()
+        FlightSchedule.materialize(date.today() + timedelta(days=4))
+        sold = schedule.flights.order_by("departure_time").first()
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user("test@test.com", "test12345")
+        )
+        Ticket.objects.create(row=1, seat=1, flight=sold, order=order)
+
+        schedule.reset_flights()
+        self.assertEqual(list(schedule.flights.all()), [sold])
+
+        created = FlightSchedule.materialize(date.today() + timedelta(days=4))
+        self.assertEqual(created, 4)
+        self.assertEqual(schedule.flights.count(), 5)
+
+    def test_generate_scheduled_flights_command(self):
+        sample_schedule()
+
+        out = StringIO()
+        call_command("generate_scheduled_flights", "--days=9", stdout=out)
+
+        self.assertEqual(Flight.objects.count(), 10)
+        self.assertIn("Created 10 flights", out.getvalue())
+
+
+class FlightScheduleApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.schedule = sample_schedule(valid_from=date.today() + timedelta(days=1))
+
+    def payload(self, **params):
+        payload = {
+            "route": self.schedule.route_id,
+            "airplane": self.schedule.airplane_id,
+            "days_of_week": "135",
+            "departure_time": "08:00:00",
+            "duration": "01:30:00",
+            "valid_from": "2023-09-01",
+        }
+        payload.update(params)
+        return payload
+
+    def test_create_schedule(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(FLIGHT_SCHEDULE_URL, self.payload())
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        schedule = FlightSchedule.objects.get(id=res.data["id"])
+        self.assertEqual(
+            schedule.generated_until,
+            date.today() + settings.FLIGHT_SCHEDULE_HORIZON,
+        )
+        self.assertTrue(schedule.flights.exists())
+
+    def test_create_schedule_with_invalid_days(self):
+        for days_of_week in ("", "08", "113"):
+            with self.subTest(days_of_week):
+                res = self.client.post(
+                    FLIGHT_SCHEDULE_URL, self.payload(days_of_week=days_of_week)
+                )
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("days_of_week", res.data)
+
+    def test_create_schedule_ending_before_start(self):
+        res = self.client.post(
+            FLIGHT_SCHEDULE_URL, self.payload(valid_until="2023-08-01")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("valid_until", res.data)
+
+    def test_update_schedule_regenerates_flights(self):
+        FlightSchedule.materialize(date.today() + timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(
+                detail_url(self.schedule.id), {"departure_time": "23:45:00"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.schedule.flights.exists())
+        self.assertEqual(
+            set(self.schedule.flights.values_list("departure_time__time", flat=True)),
+            {time(23, 45)},
+        )
+
+    def test_delete_schedule_removes_unsold_flights(self):
+        FlightSchedule.materialize(date.today() + timedelta(days=2))
+
+        res = self.client.delete(detail_url(self.schedule.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_create_schedule_forbidden_for_non_admin(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.post(FLIGHT_SCHEDULE_URL, self.payload())
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
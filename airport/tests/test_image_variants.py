@@ -0,0 +1,177 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.images import save_variants
+from airport.models import AirplaneType, Airport
+from airport.tests.test_airport_api import sample_airport
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload_url(airport_id):
+    return reverse("airport:airport-upload-image", args=[airport_id])
+
+
+def sample_image(size=(1600, 800), image_format="JPEG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, "navy").save(buffer, image_format)
+    return SimpleUploadedFile(
+        f"image.{image_format.lower()}",
+        buffer.getvalue(),
+        content_type=f"image/{image_format.lower()}",
+    )
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_WORKERS=0,
+    IMAGE_VARIANTS={"thumbnail": (160, 160), "medium": (640, 640)},
+)
+class ImageVariantsTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "test12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.airport = sample_airport()
+
+    def upload(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                image_upload_url(self.airport.id),
+                {"image": image},
+                format="multipart",
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.airport.refresh_from_db()
+        return res
+
+    def test_upload_generates_variants(self):
+        self.upload(sample_image())
+
+        variants = self.airport.image_variants
+        self.assertEqual(set(variants), {"thumbnail", "medium"})
+        self.assertEqual(
+            (variants["thumbnail"]["width"], variants["thumbnail"]["height"]),
+            (160, 80),
+        )
+        self.assertEqual(
+            (variants["medium"]["width"], variants["medium"]["height"]),
+            (640, 320),
+        )
+        storage = self.airport.image.storage
+        for files in variants.values():
+            with storage.open(files["webp"]) as file:
+                self.assertEqual(Image.open(file).format, "WEBP")
+            with storage.open(files["jpeg"]) as file:
+                self.assertEqual(Image.open(file).format, "JPEG")
+
+    def test_variant_urls(self):
+        self.upload(sample_image())
+
+        res = self.client.get(
+            reverse("airport:airport-detail", args=[self.airport.id])
+        )
+
+        thumbnail = res.data["image_variants"]["thumbnail"]
+        self.assertTrue(
+            thumbnail["webp"].startswith("http://testserver/media/images/")
+        )
+        self.assertTrue(thumbnail["webp"].endswith(".webp"))
+        self.assertTrue(thumbnail["jpeg"].endswith(".jpeg"))
+
+    def test_transparent_png_keeps_alpha_in_webp(self):
+        buffer = BytesIO()
+        Image.new("RGBA", (400, 400), (0, 0, 0, 0)).save(buffer, "PNG")
+        self.upload(
+            SimpleUploadedFile(
+                "image.png", buffer.getvalue(), content_type="image/png"
+            )
+        )
+
+        files = self.airport.image_variants["thumbnail"]
+        with self.airport.image.storage.open(files["webp"]) as file:
+            self.assertEqual(Image.open(file).mode, "RGBA")
+
+    def test_new_image_replaces_variants(self):
+        self.upload(sample_image())
+        previous = self.airport.image_variants["thumbnail"]["webp"]
+
+        self.upload(sample_image(size=(300, 600)))
+
+        self.assertNotEqual(
+            self.airport.image_variants["thumbnail"]["webp"], previous
+        )
+        self.assertEqual(
+            self.airport.image_variants["thumbnail"]["height"], 160
+        )
+
+    def test_same_image_reuses_variants(self):
+        self.upload(sample_image())
+        variants = self.airport.image_variants
+        other = sample_airport(name="Other")
+
+        with patch("airport.images.generate_variants") as generate:
+            self.upload(sample_image())
+            with self.captureOnCommitCallbacks(execute=True):
+                other.image = self.airport.image.name
+                other.save()
+
+        generate.assert_not_called()
+        self.assertEqual(self.airport.image_variants, variants)
+        other.refresh_from_db()
+        self.assertEqual(other.image_variants, variants)
+
+    def test_other_changes_keep_variants(self):
+        self.upload(sample_image())
+        variants = self.airport.image_variants
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.airport.name = "Renamed"
+            self.airport.save()
+
+        self.airport.refresh_from_db()
+        self.assertEqual(self.airport.image_variants, variants)
+
+    def test_variants_of_replaced_image_are_not_stored(self):
+        self.upload(sample_image())
+        name = self.airport.image.name
+        variants = self.airport.image_variants
+        Airport.objects.filter(pk=self.airport.pk).update(
+            image="images/airport/other.jpg"
+        )
+
+        self.assertFalse(save_variants(Airport, self.airport.pk, name))
+        self.airport.refresh_from_db()
+        self.assertEqual(self.airport.image_variants, variants)
+
+    def test_generate_image_variants_command(self):
+        self.upload(sample_image())
+        Airport.objects.update(image_variants={})
+        airplane_type = AirplaneType.objects.create(name="No image")
+        out = StringIO()
+
+        call_command("generate_image_variants", stdout=out)
+
+        self.airport.refresh_from_db()
+        airplane_type.refresh_from_db()
+        self.assertIn("thumbnail", self.airport.image_variants)
+        self.assertEqual(airplane_type.image_variants, {})
+        self.assertIn("Generated variants of 1 images", out.getvalue())
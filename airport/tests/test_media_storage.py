@@ -0,0 +1,231 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from airport.storage import content_addressed_storage, is_blob
+from airport.tests.test_airport_api import sample_airport
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def age(name, seconds):
+    """Move the modification time of ``name`` ``seconds`` back."""
+    path = content_addressed_storage.path(name)
+    modified = os.path.getmtime(path) - seconds
+    os.utime(path, (modified, modified))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_WORKERS=0)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def save(self, content, name="images/airport/photo.JPG"):
+        return content_addressed_storage.save(name, ContentFile(content))
+
+    def test_names_files_by_content(self):
+        name = self.save(b"photo")
+
+        self.assertTrue(is_blob(name))
+        self.assertTrue(name.startswith("images/airport/"))
+        self.assertTrue(name.endswith(".jpg"))
+        with content_addressed_storage.open(name) as file:
+            self.assertEqual(file.read(), b"photo")
+
+    def test_deduplicates_identical_content(self):
+        name = self.save(b"photo")
+
+        self.assertEqual(self.save(b"photo", "images/airport/copy.jpg"), name)
+        self.assertNotEqual(self.save(b"other"), name)
+        directory = os.path.dirname(content_addressed_storage.path(name))
+        self.assertEqual(os.listdir(directory), [os.path.basename(name)])
+
+    def test_garbage_collection(self):
+        referenced = self.save(b"referenced")
+        unreferenced = self.save(b"unreferenced")
+        recent = self.save(b"recent")
+        legacy = content_addressed_storage.path("images/airport/legacy.jpg")
+        with open(legacy, "wb") as file:
+            file.write(b"legacy")
+        sample_airport(image=referenced)
+        for name in (referenced, unreferenced, "images/airport/legacy.jpg"):
+            age(name, 3600)
+
+        out = StringIO()
+        call_command("collect_media_garbage", "--min-age=60", stdout=out)
+
+        self.assertIn("Deleted 1 files", out.getvalue())
+        self.assertFalse(content_addressed_storage.exists(unreferenced))
+        for name in (referenced, recent, "images/airport/legacy.jpg"):
+            self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_garbage_collection_dry_run(self):
+        name = self.save(b"unreferenced")
+        age(name, 3600)
+
+        out = StringIO()
+        call_command(
+            "collect_media_garbage", "--min-age=60", "--dry-run", stdout=out
+        )
+
+        self.assertIn(name, out.getvalue())
+        self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_saving_again_protects_from_garbage_collection(self):
+        name = self.save(b"photo")
+        age(name, 3600)
+
+        self.save(b"photo")
+        call_command(
+            "collect_media_garbage", "--min-age=60", stdout=StringIO()
+        )
+
+        self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_blobs_are_served_immutable(self):
+        name = self.save(b"photo")
+
+        res = self.client.get(reverse("media", args=[name]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(res.streaming_content), b"photo")
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+    def test_other_uploads_are_served_revalidated(self):
+        os.makedirs(content_addressed_storage.path("images"), exist_ok=True)
+        with open(content_addressed_storage.path("images/a.jpg"), "wb") as f:
+            f.write(b"legacy")
+
+        res = self.client.get(reverse("media", args=["images/a.jpg"]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Cache-Control", res)
+
+    def test_only_uploads_are_served(self):
+        with open(os.path.join(MEDIA_ROOT, "settings.py"), "w") as file:
+            file.write("SECRET_KEY = 'x'")
+
+        for path in ("settings.py", "images/../settings.py"):
+            with self.subTest(path):
+                res = self.client.get(f"/media/{path}")
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE="")
+class ServeMediaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.name = content_addressed_storage.save(
+            "images/airport/photo.jpg", ContentFile(b"0123456789")
+        )
+        cls.url = reverse("media", args=[cls.name])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_conditional_get(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Length"], "10")
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+
+        for headers in (
+            {"HTTP_IF_NONE_MATCH": res["ETag"]},
+            {"HTTP_IF_MODIFIED_SINCE": res["Last-Modified"]},
+        ):
+            with self.subTest(headers):
+                res = self.client.get(self.url, **headers)
+                self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(
+                    res["Cache-Control"],
+                    "public, max-age=31536000, immutable",
+                )
+
+    def test_ranges(self):
+        for header, content, content_range in (
+            ("bytes=2-4", b"234", "bytes 2-4/10"),
+            ("bytes=7-", b"789", "bytes 7-9/10"),
+            ("bytes=-2", b"89", "bytes 8-9/10"),
+            ("bytes=8-100", b"89", "bytes 8-9/10"),
+        ):
+            with self.subTest(header):
+                res = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(
+                    res.status_code, status.HTTP_206_PARTIAL_CONTENT
+                )
+                self.assertEqual(b"".join(res.streaming_content), content)
+                self.assertEqual(res["Content-Range"], content_range)
+                self.assertEqual(res["Content-Length"], str(len(content)))
+
+    def test_ignored_ranges(self):
+        for headers in (
+            {"HTTP_RANGE": "bytes=0-1,4-5"},
+            {"HTTP_RANGE": "bytes=2-4", "HTTP_IF_RANGE": '"stale"'},
+        ):
+            with self.subTest(headers):
+                res = self.client.get(self.url, **headers)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    b"".join(res.streaming_content), b"0123456789"
+                )
+
+    def test_range_not_satisfiable(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=10-")
+
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(res["Content-Range"], "bytes */10")
+
+    @override_settings(
+        MEDIA_SENDFILE="x-accel-redirect",
+        MEDIA_INTERNAL_URL="/internal-media/",
+    )
+    def test_x_accel_redirect(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/internal-media/{self.name}"
+        )
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", res["Cache-Control"])
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_x_sendfile(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(
+            res["X-Sendfile"], content_addressed_storage.path(self.name)
+        )
+        self.assertEqual(res.content, b"")
+
+    def test_missing_files_and_directories(self):
+        for path in (
+            "images/airport/missing.jpg",
+            "images/airport",
+            "images/a\x00b",
+        ):
+            with self.subTest(path):
+                res = self.client.get(reverse("media", args=[path]))
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_read_only(self):
+        res = self.client.post(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
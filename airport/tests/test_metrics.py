@@ -0,0 +1,135 @@
+import re
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.metrics import HISTOGRAMS, RequestMetricsMiddleware
+from airport.tests.test_flight_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+METRICS_URL = reverse("metrics")
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        for histogram in HISTOGRAMS:
+            histogram.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        sample_flight()
+
+        with self.assertNumQueries(2):
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertRegex(
+            res["Server-Timing"],
+            r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries"$',
+        )
+
+    async def test_async_request_counts_queries_of_other_threads(self):
+        await sync_to_async(sample_flight)()
+        token = AccessToken.for_user(self.user)
+
+        res = await self.async_client.get(
+            ASYNC_FLIGHT_URL, AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(res["Server-Timing"], r'desc="[1-9]\d* queries"$')
+
+    def test_middleware_runs_async_under_asgi(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(
+            iscoroutinefunction(RequestMetricsMiddleware(get_response))
+        )
+        self.assertFalse(
+            iscoroutinefunction(RequestMetricsMiddleware(lambda request: None))
+        )
+
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+    def test_metrics_endpoint(self):
+        sample_flight()
+        self.client.get(FLIGHT_URL)
+        self.client.get(FLIGHT_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        metrics = res.content.decode()
+        labels = 'method="GET",endpoint="airport:flight-list",status="200"'
+        self.assertIn(
+            "# TYPE airport_http_request_duration_seconds histogram", metrics
+        )
+        self.assertIn(
+            f"airport_http_request_duration_seconds_count{{{labels}}} 2",
+            metrics,
+        )
+        self.assertIn(
+            f'airport_http_request_db_queries_bucket{{{labels},le="2"}} 2',
+            metrics,
+        )
+        self.assertIn(
+            f'airport_http_request_db_queries_bucket{{{labels},le="1"}} 0',
+            metrics,
+        )
+        self.assertRegex(
+            metrics,
+            re.escape(f"airport_http_request_db_duration_seconds_sum{{{labels}}}")
+            + r" [\d.e-]+",
+        )
+
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+    def test_unknown_methods_share_a_label(self):
+        for method in ("FOO", "BAR"):
+            self.client.generic(method, FLIGHT_URL)
+
+        metrics = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn('method="other",endpoint="airport:flight-list"', metrics)
+        self.assertNotIn('method="FOO"', metrics)
+
+    @override_settings(
+        REQUEST_METRICS_SAMPLE_RATE=0, METRICS_ALLOWED_IPS=["127.0.0.1"]
+    )
+    def test_unsampled_requests_are_not_measured(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertNotIn(
+            "airport:flight-list", self.client.get(METRICS_URL).content.decode()
+        )
+
+    def test_metrics_endpoint_forbidden_outside_allowed_ips(self):
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="10.0.0.1")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_endpoint_forbidden_by_default(self):
+        # e.g. proxied by a web server on the same host
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="127.0.0.1")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_endpoint_allowed_to_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
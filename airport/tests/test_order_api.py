@@ -0,0 +1,148 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.test_flight_api import sample_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def order_payload(flight, seats):
+    return {
+        "tickets": [
+            {"row": row, "seat": seat, "flight": flight.id} for row, seat in seats
+        ]
+    }
+
+
+class UnauthenticatedOrderApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedOrderApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(rows=20)
+
+    def test_create_order(self):
+        payload = order_payload(self.flight, [(1, 1), (1, 2), (2, 1)])
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(id=res.data["id"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(order.tickets.count(), 3)
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        small = order_payload(self.flight, [(1, seat) for seat in range(1, 3)])
+        large = order_payload(
+            self.flight,
+            [(row, seat) for row in range(2, 20) for seat in range(1, 11)],
+        )
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.post(ORDER_URL, small, format="json")
+        with CaptureQueriesContext(connection) as large_queries:
+            res = self.client.post(ORDER_URL, large, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small_queries), len(large_queries))
+
+    def test_create_order_with_seat_out_of_range(self):
+        payload = order_payload(self.flight, [(1, 1), (21, 1)])
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][1]["row"][0],
+            "row number must be in available range: (1, rows): (1, 20)",
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_with_taken_seat(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        payload = order_payload(self.flight, [(1, 2), (1, 1)])
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_order_with_duplicated_seat(self):
+        payload = order_payload(self.flight, [(3, 3), (3, 3)])
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+
+    def test_create_order_with_unknown_flight(self):
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": 999}]}
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", res.data["tickets"][0])
+
+    def test_create_order_cannot_mark_it_paid(self):
+        payload = order_payload(self.flight, [(1, 1)])
+        payload["paid"] = True
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Order.objects.get(id=res.data["id"]).paid)
+
+    def test_update_order_forbidden(self):
+        order = Order.objects.create(user=self.user)
+        url = reverse("airport:order-detail", args=[order.id])
+
+        res = self.client.patch(url, {"paid": True}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        order.refresh_from_db()
+        self.assertFalse(order.paid)
+
+    def test_orders_cannot_be_updated_by_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        order = Order.objects.create(user=self.user)
+        url = reverse("airport:order-detail", args=[order.id])
+
+        for method in (self.client.put, self.client.patch):
+            res = method(
+                url, order_payload(self.flight, [(1, 1)]), format="json"
+            )
+            self.assertEqual(
+                res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+            )
+
+    def test_delete_order_forbidden(self):
+        order = Order.objects.create(user=self.user)
+
+        res = self.client.delete(
+            reverse("airport:order-detail", args=[order.id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Order.objects.filter(id=order.id).exists())
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.test_flight_api import sample_flight
+
+
+def export_url(export_format):
+    return reverse("airport:order-export", args=[export_format])
+
+
+class OrderExportApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test12345",
+            is_staff=True,
+        )
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.admin)
+
+        flight = sample_flight()
+        self.orders = []
+        for day, paid in ((1, True), (2, False), (3, True)):
+            order = Order.objects.create(user=self.user, paid=paid)
+            Order.objects.filter(pk=order.pk).update(
+                created_at=datetime(2023, 9, day, 12)
+            )
+            for seat in (1, 2):
+                Ticket.objects.create(row=day, seat=seat, flight=flight, order=order)
+            self.orders.append(order)
+
+    def get_content(self, res):
+        return b"".join(res.streaming_content).decode()
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(export_url("ndjson"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_ndjson(self):
+        res = self.client.get(export_url("ndjson"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        orders = [json.loads(line) for line in self.get_content(res).splitlines()]
+        self.assertEqual([order["id"] for order in orders], [o.id for o in self.orders])
+        self.assertEqual(orders[0]["created_at"], "2023-09-01T12:00:00")
+        self.assertEqual(orders[0]["user"], self.user.id)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in orders[0]["tickets"]],
+            [(1, 1), (1, 2)],
+        )
+        self.assertEqual(orders[0]["tickets"][0]["source"], "Test")
+
+    def test_export_csv(self):
+        res = self.client.get(export_url("csv"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('filename="orders.csv"', res["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.get_content(res))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["order_id"], str(self.orders[0].id))
+        self.assertEqual(rows[0]["order_paid"], "True")
+
+    def test_export_filters(self):
+        res = self.client.get(
+            export_url("ndjson"),
+            {
+                "created_after": "2023-09-02",
+                "created_before": "2023-09-03",
+                "paid": "true",
+            },
+        )
+
+        orders = [json.loads(line) for line in self.get_content(res).splitlines()]
+        self.assertEqual([order["id"] for order in orders], [self.orders[2].id])
+
+    def test_export_invalid_filter(self):
+        res = self.client.get(export_url("csv"), {"created_after": "yesterday"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_fetches_orders_and_tickets_once_per_chunk(self):
+        res = self.client.get(export_url("ndjson"))
+
+        with self.assertNumQueries(2):
+            self.get_content(res)
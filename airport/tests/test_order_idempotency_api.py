@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.mixins import CreateModelMixin
+from rest_framework.test import APIClient
+
+from airport.models import Order
+from airport.tests.test_flight_api import sample_flight
+from airport.tests.test_order_api import ORDER_URL, order_payload
+
+
+class OrderIdempotencyApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = order_payload(self.flight, [(1, 1), (1, 2)])
+
+    def create_order(self, payload=None, key="key-1"):
+        return self.client.post(
+            ORDER_URL,
+            payload or self.payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_response(self):
+        first = self.create_order()
+
+        with self.assertNumQueries(0):
+            retry = self.create_order()
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_different_keys_create_different_orders(self):
+        self.create_order(key="key-1")
+        res = self.create_order(
+            order_payload(self.flight, [(2, 1)]), key="key-2"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_for_different_request(self):
+        self.create_order()
+
+        res = self.create_order(order_payload(self.flight, [(2, 1)]))
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_concurrent_duplicate_conflicts(self):
+        duplicates = []
+
+        def create_with_duplicate(viewset, request, *args, **kwargs):
+            duplicates.append(self.create_order())
+            return original_create(viewset, request, *args, **kwargs)
+
+        original_create = CreateModelMixin.create
+        with patch.object(CreateModelMixin, "create", create_with_duplicate):
+            res = self.create_order()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(duplicates[0].status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(duplicates[0]["Retry-After"], "1")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_frees_key(self):
+        invalid = order_payload(self.flight, [(1, 1), (21, 1)])
+
+        res = self.create_order(invalid)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.create_order()
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_keys_are_scoped_to_user(self):
+        self.create_order()
+        other = get_user_model().objects.create_user(
+            "other@test.com", "test12345"
+        )
+        self.client.force_authenticate(other)
+
+        res = self.create_order(order_payload(self.flight, [(2, 1)]))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_without_key(self):
+        for seats in ([(1, 1)], [(1, 2)]):
+            res = self.client.post(
+                ORDER_URL, order_payload(self.flight, seats), format="json"
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_invalid_key(self):
+        res = self.create_order(key="k" * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 0)
@@ -0,0 +1,233 @@
+import time
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Facility,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+# Queries each read action may run, whatever the number of rows.
+EXPECTED_QUERIES = {
+    "async-flight-list": 2,
+    "async-flight-detail": 4,
+    "async-flight-seatmap": 1,
+    "async-route-list": 1,
+    "airport-list": 1,
+    "airport-detail": 1,
+    "airplanetype-list": 1,
+    "airplanetype-detail": 1,
+    "airplane-list": 3,
+    "airplane-detail": 4,
+    "crew-list": 2,
+    "crew-detail": 2,
+    "facility-list": 1,
+    "facility-detail": 1,
+    "flight-list": 2,
+    "flight-detail": 4,
+    "flight-search": 2,
+    "flight-seatmap": 1,
+    "order-list": 3,
+    "order-detail": 2,
+    "route-list": 1,
+    "route-detail": 1,
+}
+
+# Seconds a single request may take, generous enough for slow CI machines.
+TIME_BUDGET = {10: 1.0, 100: 2.0, 1000: 5.0}
+
+
+def populate(user, size):
+    """
+    Create ``size`` rows of every model, with the first airplane,
+    crew member, flight and order also related to ``size`` rows.
+    """
+    airports = Airport.objects.bulk_create(
+        Airport(name=f"Airport {i}", closest_big_city="City", country="Country")
+        for i in range(size)
+    )
+    airplane_types = AirplaneType.objects.bulk_create(
+        AirplaneType(name=f"Type {i}") for i in range(size)
+    )
+    facilities = Facility.objects.bulk_create(
+        Facility(name=f"Facility {i}") for i in range(size)
+    )
+    crews = Crew.objects.bulk_create(
+        Crew(first_name=f"First {i}", last_name="Last", position="pilot")
+        for i in range(size)
+    )
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(
+            name=f"Airplane {i}",
+            rows=size,
+            seats_in_row=2,
+            airplane_type=airplane_types[i],
+        )
+        for i in range(size)
+    )
+    Airplane.facilities.through.objects.bulk_create(
+        [
+            Airplane.facilities.through(airplane=airplanes[0], facility=facility)
+            for facility in facilities
+        ]
+        + [
+            Airplane.facilities.through(airplane=airplane, facility=facilities[0])
+            for airplane in airplanes[1:]
+        ]
+    )
+    Airplane.crew.through.objects.bulk_create(
+        [Airplane.crew.through(airplane=airplanes[0], crew=crew) for crew in crews]
+        + [
+            Airplane.crew.through(airplane=airplane, crew=crews[0])
+            for airplane in airplanes[1:]
+        ]
+    )
+    routes = Route.objects.bulk_create(
+        Route(
+            source=airports[i],
+            destination=airports[-i - 1],
+            distance=1000,
+        )
+        for i in range(size)
+    )
+    # upcoming, so the connection graph holds the flights
+    departure = datetime.combine(date.today(), datetime.min.time()) + timedelta(
+        days=7, hours=18
+    )
+    flights = Flight.objects.bulk_create(
+        Flight(
+            route=routes[i],
+            airplane=airplanes[i],
+            departure_time=departure + timedelta(hours=i),
+            arrival_time=departure + timedelta(hours=i + 1),
+        )
+        for i in range(size)
+    )
+    orders = Order.objects.bulk_create(Order(user=user) for _ in range(size))
+    Ticket.objects.bulk_create(
+        [
+            Ticket(row=i + 1, seat=1, flight=flights[0], order=orders[0])
+            for i in range(size)
+        ]
+        + [
+            Ticket(row=1, seat=2, flight=flights[i], order=orders[i])
+            for i in range(1, size)
+        ]
+    )
+    Flight.rebuild_occupancy(Flight.objects.select_related("airplane"))
+
+    return {
+        "airport": airports[0],
+        "airplanetype": airplane_types[0],
+        "airplane": airplanes[0],
+        "crew": crews[0],
+        "facility": facilities[0],
+        "flight": flights[0],
+        "order": orders[0],
+        "route": routes[0],
+    }
+
+
+class QueryCountMixin:
+    """
+    Every read action of every viewset must run the same number of
+    queries whatever the amount of data, within a time budget.
+    """
+
+    size = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        cls.objects = populate(cls.user, cls.size)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_constant_queries(self, url_name, url):
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            res = self.client.get(url)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            len(queries),
+            EXPECTED_QUERIES[url_name],
+            f"{url_name} with {self.size} rows ran:\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        self.assertLess(elapsed, TIME_BUDGET[self.size])
+
+    def test_list_actions(self):
+        for basename in self.objects:
+            url_name = f"{basename}-list"
+            with self.subTest(url_name):
+                self.assert_constant_queries(url_name, reverse(f"airport:{url_name}"))
+
+    def test_detail_actions(self):
+        for basename, obj in self.objects.items():
+            url_name = f"{basename}-detail"
+            with self.subTest(url_name):
+                self.assert_constant_queries(
+                    url_name, reverse(f"airport:{url_name}", args=[obj.id])
+                )
+
+    def test_flight_actions(self):
+        flight = self.objects["flight"]
+
+        self.assert_constant_queries(
+            "flight-search",
+            reverse("airport:flight-search")
+            + f"?source={flight.route.source_id}&min_seats=1",
+        )
+        self.assert_constant_queries(
+            "flight-seatmap", reverse("airport:flight-seatmap", args=[flight.id])
+        )
+
+    def test_async_actions(self):
+        flight = self.objects["flight"]
+
+        for url_name, args in (
+            ("async-flight-list", []),
+            ("async-flight-detail", [flight.id]),
+            ("async-flight-seatmap", [flight.id]),
+            ("async-route-list", []),
+        ):
+            with self.subTest(url_name):
+                self.assert_constant_queries(
+                    url_name, reverse(f"airport:{url_name}", args=args)
+                )
+
+
+class QueryCount10Test(QueryCountMixin, TestCase):
+    size = 10
+
+
+class QueryCount100Test(QueryCountMixin, TestCase):
+    size = 100
+
+
+class QueryCount1000Test(QueryCountMixin, TestCase):
+    size = 1000
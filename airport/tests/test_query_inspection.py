@@ -0,0 +1,169 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Flight, FlightSchedule, SeatHold
+from airport.query_inspection import (
+    QueryInspectionError,
+    QueryInspector,
+    normalize_sql,
+)
+from airport.serializers import FlightListSerializer
+from airport.tests.test_query_counts import populate
+from airport.urls import router
+
+# Path kwargs and query parameters the read actions need.
+URL_KWARGS = {"order-export": {"export_format": "ndjson"}}
+
+
+class QueryInspectionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            "test@test.com", "test12345", is_staff=True
+        )
+        cls.objects = populate(cls.user, 5)
+        flight = cls.objects["flight"]
+        cls.objects["flightschedule"] = FlightSchedule.objects.create(
+            route=flight.route,
+            airplane=flight.airplane,
+            days_of_week="135",
+            departure_time=time(9),
+            duration=timedelta(hours=2),
+            valid_from=date(2023, 9, 1),
+        )
+        SeatHold.objects.bulk_create(
+            SeatHold(
+                row=1,
+                seat=2,
+                flight=flight,
+                user=cls.user,
+                expires_at=timezone.now() + timedelta(minutes=10),
+            )
+            for flight in Flight.objects.all()
+        )
+        cls.query_params = {
+            "airport-autocomplete": {"q": "a"},
+            "connection-list": {
+                "source": flight.route.source_id,
+                "destination": flight.route.destination_id,
+                "departure_time": flight.departure_time.date().isoformat(),
+            },
+        }
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT * FROM t WHERE a = 1 AND b = 'x''y' AND c IN (1, 2)"
+            ),
+            normalize_sql("SELECT * FROM t WHERE a = 25 AND b = '' AND c IN (3)"),
+        )
+
+    def test_repeated_queries_report_field_path(self):
+        for departure in range(3):
+            Flight.objects.create(
+                route=self.objects["route"],
+                airplane=self.objects["airplane"],
+                departure_time=f"2024-01-0{departure + 1}T10:00:00",
+                arrival_time=f"2024-01-0{departure + 1}T12:00:00",
+            )
+
+        with QueryInspector(repeat_threshold=3) as inspector:
+            FlightListSerializer(Flight.objects.all(), many=True).data
+
+        field_paths = {problem.field_path for problem in inspector.problems}
+        self.assertIn("destination", field_paths)
+        self.assertIn("airplane_name", field_paths)
+        problem = inspector.problems[0]
+        self.assertEqual(problem.kind, "repeated query")
+        self.assertGreaterEqual(problem.count, 3)
+
+    def test_slow_queries(self):
+        with QueryInspector(slow_threshold=1e-9) as inspector:
+            Flight.objects.count()
+
+        self.assertEqual(
+            [problem.kind for problem in inspector.problems], ["slow query"]
+        )
+
+    @override_settings(
+        QUERY_INSPECTION="raise", QUERY_INSPECTION_REPEAT_THRESHOLD=1
+    )
+    def test_middleware_raises(self):
+        with self.assertRaises(QueryInspectionError):
+            self.client.get(reverse("airport:flight-list"))
+
+    @override_settings(
+        QUERY_INSPECTION="raise", QUERY_INSPECTION_REPEAT_THRESHOLD=1
+    )
+    async def test_middleware_raises_under_asgi(self):
+        token = AccessToken.for_user(self.user)
+
+        with self.assertRaises(QueryInspectionError):
+            await self.async_client.get(
+                reverse("airport:async-flight-list"),
+                AUTHORIZATION=f"Bearer {token}",
+            )
+
+    @override_settings(
+        QUERY_INSPECTION="warn", QUERY_INSPECTION_REPEAT_THRESHOLD=1
+    )
+    def test_middleware_warns(self):
+        with self.assertLogs("airport.query_inspection", "WARNING") as logs:
+            res = self.client.get(reverse("airport:flight-list"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("repeated query", logs.output[0])
+
+    def test_no_repeated_queries_in_read_actions(self):
+        """Every GET action of every registered viewset."""
+        for _, viewset, basename in router.registry:
+            actions = [
+                (action_name, detail)
+                for handler, action_name, detail in (
+                    ("list", "list", False),
+                    ("retrieve", "detail", True),
+                )
+                if hasattr(viewset, handler)
+            ] + [
+                (extra_action.url_name, extra_action.detail)
+                for extra_action in viewset.get_extra_actions()
+                if "get" in extra_action.mapping
+            ]
+            for action_name, detail in actions:
+                url_name = f"{basename}-{action_name}"
+                kwargs = dict(URL_KWARGS.get(url_name, {}))
+                if detail:
+                    obj = self.objects.get(basename)
+                    kwargs["pk"] = obj.pk if obj is not None else 0
+                try:
+                    url = reverse(f"airport:{url_name}", kwargs=kwargs)
+                except NoReverseMatch:
+                    continue
+
+                with self.subTest(url_name):
+                    cache.clear()
+                    with QueryInspector() as inspector:
+                        res = self.client.get(
+                            url, self.query_params.get(url_name, {})
+                        )
+                        if res.streaming:
+                            b"".join(res.streaming_content)
+
+                    self.assertEqual(res.status_code, status.HTTP_200_OK)
+                    self.assertEqual(
+                        inspector.problems,
+                        [],
+                        "\n".join(map(str, inspector.problems)),
+                    )
@@ -0,0 +1,76 @@
+import io
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from airport.parsers import ORJSONParser
+from airport.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def assert_same_output(self, data, accepted_media_type=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_render_like_json_renderer(self):
+        self.assert_same_output(
+            ReturnDict(
+                {
+                    "id": 1,
+                    "created_at": datetime(2023, 9, 5, 18, 0, 0, 123456),
+                    "departure_date": date(2023, 9, 5),
+                    "duration": timedelta(hours=2),
+                    "price": Decimal("10.50"),
+                    "uuid": uuid.UUID(int=1),
+                    "name": "Київ\u2028\u2029",
+                    "tickets": ReturnList(
+                        [{"row": 1, "seat": None}], serializer=None
+                    ),
+                    2: "non string key",
+                },
+                serializer=None,
+            )
+        )
+
+    def test_render_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_render_indented(self):
+        self.assert_same_output(
+            {"id": 1}, accepted_media_type="application/json; indent=4"
+        )
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def test_parse_like_json_parser(self):
+        body = (
+            '{"tickets": [{"row": 1, "seat": 2.5, "name": "Київ"}]}'.encode()
+        )
+
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_parse_error(self):
+        for body in (b"{", b"[NaN]"):
+            with self.subTest(body):
+                with self.assertRaises(ParseError):
+                    ORJSONParser().parse(io.BytesIO(body))
+
+    def test_parse_other_encoding(self):
+        body = '{"name": "Київ"}'.encode("utf-16")
+
+        data = ORJSONParser().parse(
+            io.BytesIO(body), parser_context={"encoding": "utf-16"}
+        )
+
+        self.assertEqual(data, {"name": "Київ"})
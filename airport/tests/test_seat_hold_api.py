@@ -0,0 +1,222 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, SeatHold, Ticket
+from airport.tests.test_flight_api import sample_flight
+from airport.tests.test_order_api import ORDER_URL, order_payload
+
+SEAT_HOLD_URL = reverse("airport:seathold-list")
+
+
+def detail_url(seat_hold_id):
+    return reverse("airport:seathold-detail", args=[seat_hold_id])
+
+
+def hold_payload(flight, seats):
+    return [{"row": row, "seat": seat, "flight": flight.id} for row, seat in seats]
+
+
+class UnauthenticatedSeatHoldApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(SEAT_HOLD_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com",
+            "test12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def hold(self, user, row, seat, expires_in=timedelta(minutes=10), **params):
+        return SeatHold.objects.create(
+            row=row,
+            seat=seat,
+            flight=self.flight,
+            user=user,
+            expires_at=timezone.now() + expires_in,
+            **params,
+        )
+
+    def test_hold_seats(self):
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(1, 1), (1, 2)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+        self.assertGreater(
+            SeatHold.objects.first().expires_at,
+            timezone.now() + timedelta(minutes=9),
+        )
+
+    def test_hold_single_seat(self):
+        res = self.client.post(
+            SEAT_HOLD_URL, {"row": 1, "seat": 1, "flight": self.flight.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["row"], 1)
+        self.assertIn("expires_at", res.data)
+
+    def test_hold_seat_held_by_another_user(self):
+        self.hold(self.other, 1, 1)
+
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(1, 2), (1, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertEqual(
+            res.data[1]["non_field_errors"][0],
+            "The seat is held by another customer.",
+        )
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_hold_sold_seat(self):
+        order = Order.objects.create(user=self.other)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(1, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_hold_is_taken_over(self):
+        self.hold(self.other, 1, 1, expires_in=timedelta(minutes=-1))
+
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(1, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_hold_again_extends_hold(self):
+        hold = self.hold(self.user, 1, 1, expires_in=timedelta(minutes=1))
+
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(1, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(SeatHold.objects.get().expires_at, hold.expires_at)
+
+    def test_hold_again_stops_at_max_age(self):
+        created_at = timezone.now() - timedelta(minutes=25)
+        self.hold(
+            self.user, 1, 1, expires_in=timedelta(minutes=1), created_at=created_at
+        )
+
+        with override_settings(SEAT_HOLD_MAX_AGE=timedelta(minutes=30)):
+            res = self.client.post(
+                SEAT_HOLD_URL, hold_payload(self.flight, [(1, 1)]), format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        hold = SeatHold.objects.get()
+        self.assertEqual(hold.created_at, created_at)
+        self.assertEqual(hold.expires_at, created_at + timedelta(minutes=30))
+
+    @override_settings(SEAT_HOLD_MAX_PER_USER=2)
+    def test_hold_over_max_per_user(self):
+        self.hold(self.user, 1, 1)
+        self.hold(self.user, 1, 2, expires_in=timedelta(minutes=-1))
+
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(2, 1), (2, 2)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["non_field_errors"][0],
+            "A customer can hold at most 2 seats at a time.",
+        )
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+
+        res = self.client.post(
+            SEAT_HOLD_URL, hold_payload(self.flight, [(1, 1), (2, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_list_own_active_holds(self):
+        own = self.hold(self.user, 1, 1)
+        self.hold(self.user, 1, 2, expires_in=timedelta(minutes=-1))
+        self.hold(self.other, 1, 3)
+
+        res = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([hold["id"] for hold in res.data], [own.id])
+
+    def test_release_hold(self):
+        hold = self.hold(self.user, 1, 1)
+
+        res = self.client.delete(detail_url(hold.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_hold_of_another_user(self):
+        hold = self.hold(self.other, 1, 1)
+
+        res = self.client.delete(detail_url(hold.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_held_seat_releases_hold(self):
+        self.hold(self.user, 1, 1)
+
+        res = self.client.post(
+            ORDER_URL, order_payload(self.flight, [(1, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_order_seat_held_by_another_user(self):
+        self.hold(self.other, 1, 1)
+
+        res = self.client.post(
+            ORDER_URL, order_payload(self.flight, [(1, 1)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["non_field_errors"][0],
+            "The seat is held by another customer.",
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_release_expired_seat_holds(self):
+        active = self.hold(self.user, 1, 1)
+        self.hold(self.other, 1, 2, expires_in=timedelta(minutes=-1))
+
+        out = StringIO()
+        call_command("release_expired_seat_holds", stdout=out)
+
+        self.assertEqual(list(SeatHold.objects.all()), [active])
+        self.assertIn("Released 1", out.getvalue())
@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests.test_query_counts import populate
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+ROUTE_URL = reverse("airport:route-list")
+
+
+class SparseFieldsetsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        cls.objects = populate(cls.user, 12)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, [query["sql"] for query in queries.captured_queries]
+
+    def test_fields_limit_response_and_columns(self):
+        res, queries = self.get(FLIGHT_URL, {"fields": "id,departure_time"})
+
+        for flight in res.data["results"]:
+            self.assertEqual(list(flight), ["id", "departure_time"])
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("arrival_time", queries[1])
+        self.assertNotIn("JOIN", queries[1])
+
+    def test_fields_keep_keyset_pagination(self):
+        res, _ = self.get(FLIGHT_URL, {"fields": "id", "cursor": ""})
+        res, _ = self.get(res.data["next"], {})
+
+        self.assertEqual(list(res.data["results"][0]), ["id"])
+
+    def test_expand_relation(self):
+        res, queries = self.get(
+            FLIGHT_URL,
+            {"fields": "id,route,tickets_available", "expand": "route.source"},
+        )
+
+        route = res.data["results"][0]["route"]
+        self.assertEqual(
+            list(route), ["id", "source", "destination", "distance"]
+        )
+        self.assertEqual(route["source"]["country"], "Country")
+        self.assertIsInstance(route["destination"], str)
+        self.assertEqual(len(queries), 2)
+
+    def test_expand_many_relation_prefetches_nested_relations(self):
+        crew_url = reverse("airport:crew-list")
+        res, queries = self.get(crew_url, {"expand": "airplanes"})
+
+        airplane = res.data[0]["airplanes"][0]
+        self.assertEqual(airplane["airplane_type"], "Type 0")
+        self.assertEqual(len(airplane["facilities"]), 12)
+        self.assertEqual(len(queries), 4)
+
+    def test_nested_fields(self):
+        res, queries = self.get(
+            ORDER_URL,
+            {"fields": "id,tickets.row,tickets.flight.destination"},
+        )
+
+        ticket = res.data["results"][0]["tickets"][0]
+        self.assertEqual(list(ticket), ["row", "flight"])
+        self.assertEqual(list(ticket["flight"]), ["destination"])
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn("paid", queries[1])
+        self.assertNotIn(
+            '"airport_ticket"."seat"', queries[2].split(" FROM ")[0]
+        )
+
+    def test_detail_fields(self):
+        flight = self.objects["flight"]
+
+        res, queries = self.get(
+            reverse("airport:flight-detail", args=[flight.id]),
+            {"fields": "id,taken_seats"},
+        )
+
+        self.assertEqual(list(res.data), ["id", "taken_seats"])
+        self.assertEqual(len(res.data["taken_seats"]), 12)
+        self.assertEqual(len(queries), 2)
+
+    def test_fields_bypass_values_list(self):
+        res, queries = self.get(ROUTE_URL, {"fields": "id,source"})
+
+        self.assertEqual(list(res.data[0]), ["id", "source"])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("distance", queries[0])
+
+    def test_invalid_fieldsets(self):
+        for params, error in (
+            ({"fields": "bogus"}, "fields"),
+            ({"fields": "distance.bogus"}, "fields"),
+            ({"expand": "distance"}, "expand"),
+            ({"expand": "bogus.source"}, "expand"),
+        ):
+            with self.subTest(params):
+                res = self.client.get(ROUTE_URL, params)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(error, res.data)
+
+    def test_writes_ignore_fieldsets(self):
+        res = self.client.post(
+            ORDER_URL + "?fields=id",
+            {
+                "tickets": [
+                    {"row": 5, "seat": 2, "flight": self.objects["flight"].id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn("tickets", res.data)
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.tests.test_query_counts import populate
+
+
+class ValuesListSerializersTest(TestCase):
+    """
+    List responses built from values() rows match the DRF serializers.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test12345",
+        )
+        cls.objects = populate(cls.user, 15)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_same_response(self, url):
+        responses = []
+        for enabled in (False, True):
+            cache.clear()
+            with override_settings(VALUES_LIST_SERIALIZERS=enabled):
+                responses.append(self.client.get(url).json())
+
+        self.assertEqual(responses[0], responses[1])
+
+    def test_flight_list(self):
+        for query in ("", "?page=2", "?cursor=", "?cursor=&page_size=3"):
+            with self.subTest(query):
+                self.assert_same_response(reverse("airport:flight-list") + query)
+
+    def test_flight_list_next_cursor(self):
+        with override_settings(VALUES_LIST_SERIALIZERS=True):
+            next_url = self.client.get(
+                reverse("airport:flight-list") + "?cursor="
+            ).json()["next"]
+
+        self.assert_same_response(next_url)
+
+    def test_flight_search(self):
+        flight = self.objects["flight"]
+
+        self.assert_same_response(
+            reverse("airport:flight-search")
+            + f"?source={flight.route.source_id}&min_seats=1"
+        )
+
+    def test_route_list(self):
+        self.assert_same_response(reverse("airport:route-list"))
+
+    def test_airplane_list(self):
+        facility = self.objects["facility"]
+
+        for query in ("", f"?facilities={facility.id}"):
+            with self.subTest(query):
+                self.assert_same_response(reverse("airport:airplane-list") + query)
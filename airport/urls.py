@@ -1,25 +1,54 @@
+from django.urls import path
 from rest_framework import routers
 
+from airport.async_views import (
+    FlightDetailView,
+    FlightListView,
+    FlightSeatMapView,
+    RouteListView,
+)
 from airport.views import (
     AirportViewSet,
     AirplaneTypeViewSet,
     AirplaneViewSet,
+    ConnectionViewSet,
     CrewViewSet,
     FacilityViewSet,
+    FlightScheduleViewSet,
     FlightViewSet,
     OrderViewSet,
     RouteViewSet,
+    SeatHoldViewSet,
 )
 
 router = routers.DefaultRouter()
 router.register("airports", AirportViewSet)
 router.register("airplane_types", AirplaneTypeViewSet)
 router.register("airplanes", AirplaneViewSet)
+router.register("connections", ConnectionViewSet, basename="connection")
 router.register("crews", CrewViewSet)
 router.register("facilities", FacilityViewSet)
 router.register("flights", FlightViewSet)
+router.register("flight_schedules", FlightScheduleViewSet)
 router.register("orders", OrderViewSet)
 router.register("routes", RouteViewSet)
+router.register("seat_holds", SeatHoldViewSet, basename="seathold")
+
+# async versions of the hot read endpoints, for deployments served by ASGI
+async_urlpatterns = [
+    path("async/flights/", FlightListView.as_view(), name="async-flight-list"),
+    path(
+        "async/flights/<int:pk>/",
+        FlightDetailView.as_view(),
+        name="async-flight-detail",
+    ),
+    path(
+        "async/flights/<int:pk>/seatmap/",
+        FlightSeatMapView.as_view(),
+        name="async-flight-seatmap",
+    ),
+    path("async/routes/", RouteListView.as_view(), name="async-route-list"),
+]
 
-urlpatterns = router.urls
+urlpatterns = router.urls + async_urlpatterns
 app_name = "airport"
@@ -0,0 +1,163 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from airport.models import Airplane
+
+
+class ValuesSerializer:
+    """
+    Read-only list serializer working on ``values()`` rows.
+
+    It returns the same JSON as the DRF serializer it stands in for,
+    but builds every item as a plain dict from the columns in
+    ``lookups``, without model instances or per-row field objects.
+    """
+
+    lookups = ()
+    _datetime_field = serializers.DateTimeField()
+
+    def get_values(self, queryset):
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def load_related(self, rows):
+        """Fetch what ``lookups`` cannot express for a page of rows."""
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.load_related(rows)
+        return [self.to_item(row) for row in rows]
+
+    def to_item(self, row):
+        raise NotImplementedError
+
+    def datetime(self, value):
+        return self._datetime_field.to_representation(value)
+
+
+class FlightListValuesSerializer(ValuesSerializer):
+    lookups = (
+        "id",
+        "route__destination__name",
+        "departure_time",
+        "arrival_time",
+        "airplane__name",
+        "airplane__rows",
+        "airplane__seats_in_row",
+        "seats_sold",
+    )
+
+    def to_item(self, row):
+        num_seats = row["airplane__rows"] * row["airplane__seats_in_row"]
+        return {
+            "id": row["id"],
+            "destination": row["route__destination__name"],
+            "departure_time": self.datetime(row["departure_time"]),
+            "arrival_time": self.datetime(row["arrival_time"]),
+            "airplane_name": row["airplane__name"],
+            "airplane_num_seats": num_seats,
+            "tickets_available": num_seats - row["seats_sold"],
+        }
+
+
+class RouteListValuesSerializer(ValuesSerializer):
+    lookups = (
+        "id",
+        "source__name",
+        "destination__name",
+        "distance",
+    )
+
+    def to_item(self, row):
+        return {
+            "id": row["id"],
+            "source": row["source__name"],
+            "destination": row["destination__name"],
+            "distance": row["distance"],
+        }
+
+
+class AirplaneListValuesSerializer(ValuesSerializer):
+    lookups = (
+        "id",
+        "name",
+        "airplane_type__name",
+        "rows",
+        "seats_in_row",
+    )
+
+    def load_related(self, rows):
+        airplane_ids = [row["id"] for row in rows]
+        self.facilities = self.group(
+            Airplane.facilities.through.objects.filter(
+                airplane_id__in=airplane_ids
+            ).order_by("facility__name", "facility_id"),
+            "facility__name",
+        )
+        self.crew = self.group(
+            Airplane.crew.through.objects.filter(
+                airplane_id__in=airplane_ids
+            ).order_by("crew__position", "crew__first_name", "crew_id"),
+            "crew__position",
+        )
+
+    @staticmethod
+    def group(through_queryset, lookup):
+        groups = {}
+        for airplane_id, value in through_queryset.values_list(
+            "airplane_id", lookup
+        ):
+            groups.setdefault(airplane_id, []).append(value)
+        return groups
+
+    def to_item(self, row):
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "airplane_type": row["airplane_type__name"],
+            "rows": row["rows"],
+            "seats_in_row": row["seats_in_row"],
+            "num_seats": row["rows"] * row["seats_in_row"],
+            "facilities": self.facilities.get(row["id"], []),
+            "crew": self.crew.get(row["id"], []),
+        }
+
+
+class ValuesListMixin:
+    """
+    Serve list responses of a viewset through ``values_serializer_class``
+    when the VALUES_LIST_SERIALIZERS setting is on.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def get_values_serializer(self):
+        if (
+            not settings.VALUES_LIST_SERIALIZERS
+            or self.values_serializer_class is None
+        ):
+            return None
+        return self.values_serializer_class()
+
+    def list_response(self, queryset):
+        values_serializer = self.get_values_serializer()
+        if values_serializer is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        rows = values_serializer.get_values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                values_serializer.to_representation(page)
+            )
+
+        return Response(values_serializer.to_representation(rows))
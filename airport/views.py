@@ -1,11 +1,31 @@
-from django.db.models import Count, F
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from airport.autocomplete import airport_index
+from airport.cache import CachedResponseMixin
+from airport.connections import connection_graph
+from airport.exports import EXPORTERS, get_export_queryset
+from airport.fieldsets import SparseFieldsetMixin
+from airport.idempotency import IdempotentCreateMixin
+from airport.importers import (
+    READERS,
+    FlightScheduleImporter,
+    decode_lines,
+    guess_format,
+)
 from airport.models import (
     Airport,
     AirplaneType,
@@ -13,11 +33,21 @@ from airport.models import (
     Crew,
     Facility,
     Flight,
+    FlightSchedule,
     Order,
     Route,
+    SeatHold,
+    Ticket,
+)
+from airport.pagination import FlightPagination, OrderPagination
+from airport.parsers import CSVScheduleParser, NDJSONScheduleParser
+from airport.permission import (
+    IsAdminOrIfAuthenticatedReadOnly,
+    IsAdminOrIfAuthenticatedReadOrCreate,
 )
-from airport.permission import IsAdminOrIfAuthenticatedReadOnly
 from airport.serializers import (
+    AirportAutocompleteSearchSerializer,
+    AirportAutocompleteSerializer,
     AirportSerializer,
     AirportImageSerializer,
     AirplaneTypeSerializer,
@@ -25,33 +55,77 @@ from airport.serializers import (
     AirplaneSerializer,
     AirplaneListSerializer,
     AirplaneDetailSerializer,
+    CrewAirplaneSerializer,
     CrewSerializer,
     CrewListSerializer,
     CrewDetailSerializer,
+    ConnectionSearchSerializer,
+    ConnectionSerializer,
     FacilitySerializer,
     FlightSerializer,
     FlightListSerializer,
     FlightDetailSerializer,
+    FlightScheduleSerializer,
+    FlightSeatMapSerializer,
+    FlightSearchSerializer,
+    OrderExportSerializer,
     OrderSerializer,
     OrderListSerializer,
     OrderDetailSerializer,
     RouteSerializer,
     RouteListSerializer,
     RouteDetailSerializer,
+    SeatHoldSerializer,
+)
+from airport.values_serializers import (
+    AirplaneListValuesSerializer,
+    FlightListValuesSerializer,
+    RouteListValuesSerializer,
+    ValuesListMixin,
 )
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Airport,)
 
     def get_serializer_class(self):
         if self.action == "upload_image":
             return AirportImageSerializer
+        if self.action == "autocomplete":
+            return AirportAutocompleteSerializer
 
         return AirportSerializer
 
+    @extend_schema(
+        parameters=[AirportAutocompleteSearchSerializer],
+        responses=AirportAutocompleteSerializer(many=True),
+        description=(
+            "Airports with name, closest big city or country words that "
+            "begin with the words of q, allowing a typo or two in longer "
+            "words. Exact words rank above prefixes and misspellings, "
+            "and name matches above city and country matches."
+        ),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="autocomplete",
+    )
+    def autocomplete(self, request):
+        params = AirportAutocompleteSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        airports = airport_index.search(
+            params.validated_data["q"], params.validated_data["limit"]
+        )
+        serializer = self.get_serializer(airports, many=True)
+        return Response(serializer.data)
+
     @action(
         methods=["POST"],
         detail=True,
@@ -69,10 +143,13 @@ class AirportViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (AirplaneType,)
 
     def get_serializer_class(self):
         if self.action == "upload_image":
@@ -95,12 +172,20 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(
+    SparseFieldsetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     queryset = Airplane.objects.prefetch_related(
         "crew",
         "airplane_type",
     )
     serializer_class = AirplaneSerializer
+    values_serializer_class = AirplaneListValuesSerializer
+    expandable_fields = {
+        "airplane_type": AirplaneTypeSerializer,
+        "facilities": FacilitySerializer,
+        "crew": CrewAirplaneSerializer,
+    }
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_serializer_class(self):
@@ -145,11 +230,12 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.prefetch_related(
         "airplanes",
     )
     serializer_class = CrewSerializer
+    expandable_fields = {"airplanes": AirplaneListSerializer}
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_serializer_class(self):
@@ -162,21 +248,29 @@ class CrewViewSet(viewsets.ModelViewSet):
         return CrewSerializer
 
 
-class FacilityViewSet(viewsets.ModelViewSet):
+class FacilityViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = Facility.objects.all()
     serializer_class = FacilitySerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Facility,)
 
 
-class FlightPagination(PageNumberPagination):
-    page_size = 10
-    max_page_size = 100
-
-
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(
+    SparseFieldsetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
+    values_serializer_class = FlightListValuesSerializer
     pagination_class = FlightPagination
+    expandable_fields = {
+        "route": RouteListSerializer,
+        "route.source": AirportSerializer,
+        "route.destination": AirportSerializer,
+        "airplane": AirplaneListSerializer,
+    }
+    fieldset_actions = ("list", "retrieve", "search", "seatmap")
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
@@ -185,40 +279,208 @@ class FlightViewSet(viewsets.ModelViewSet):
         if self.action == "list":
             queryset = queryset.select_related(
                 "airplane",
-                "route",
-            ).annotate(
-                tickets_available=F("airplane__rows") * F("airplane__seats_in_row")
-                - Count("tickets")
+                "route__destination",
             )
 
+        if self.action == "retrieve":
+            queryset = queryset.select_related(
+                "route__source",
+                "route__destination",
+                "airplane__airplane_type",
+            ).prefetch_related(
+                "airplane__facilities",
+                "airplane__crew",
+            )
+
+        if self.action == "search":
+            queryset = queryset.select_related(
+                "airplane",
+                "route__destination",
+            )
+
+        if self.action == "seatmap":
+            queryset = queryset.select_related("airplane")
+
         return queryset
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "search"):
             return FlightListSerializer
 
         if self.action == "retrieve":
             return FlightDetailSerializer
 
+        if self.action == "seatmap":
+            return FlightSeatMapSerializer
+
         return FlightSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "cursor",
+                type=str,
+                description=(
+                    "Switch to keyset pagination ordered by departure_time "
+                    "and id, pass an empty value for the first page "
+                    "(ex. ?cursor=)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=[FlightSearchSerializer])
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="search",
+    )
+    def search(self, request):
+        params = FlightSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = self.filter_queryset(
+            self.get_queryset().search(**params.validated_data)
+        )
+
+        return self.list_response(queryset)
+
+    @extend_schema(
+        request={
+            "text/csv": {"type": "string"},
+            "application/x-ndjson": {"type": "string"},
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            },
+        },
+        responses=OpenApiTypes.OBJECT,
+        description=(
+            "Import a schedule of flights sent as CSV or NDJSON, either as "
+            "the request body or as a .csv/.ndjson file. Every row has "
+            "route (or source and destination airport ids), airplane, "
+            "departure_time and arrival_time. Valid rows are created, "
+            "invalid ones are reported by line number."
+        ),
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[
+            CSVScheduleParser,
+            NDJSONScheduleParser,
+            MultiPartParser,
+        ],
+    )
+    def import_schedule(self, request):
+        rows = request.data.get("rows")
+
+        if rows is None:
+            schedule = request.data.get("file")
+            schedule_format = guess_format(getattr(schedule, "name", None))
+            if schedule_format is None:
+                raise ValidationError(
+                    {
+                        "file": [
+                            "Upload a .csv, .ndjson or .jsonl schedule file."
+                        ]
+                    }
+                )
+            rows = READERS[schedule_format](decode_lines(schedule))
+
+        report = FlightScheduleImporter().run(rows)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        description=(
+            "Seat occupancy packed into a base64 encoded bitmap. "
+            "Seat (row, seat) is bit (row - 1) * seats_in_row + seat - 1, "
+            "counted from the most significant bit of the first byte; "
+            "a set bit means the seat is taken."
+        ),
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="seatmap",
+    )
+    def seatmap(self, request, pk=None):
+        flight = self.get_object()
+        serializer = self.get_serializer(flight)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class FlightScheduleViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = FlightSchedule.objects.all()
+    serializer_class = FlightScheduleSerializer
+    expandable_fields = {
+        "route": RouteListSerializer,
+        "route.source": AirportSerializer,
+        "route.destination": AirportSerializer,
+        "airplane": AirplaneListSerializer,
+    }
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    @staticmethod
+    def materialize_on_commit(schedule):
+        """
+        Create the flights of the schedule up to the horizon once the
+        change is committed, instead of waiting for the daily run.
+        """
+        until = timezone.now().date() + settings.FLIGHT_SCHEDULE_HORIZON
+        transaction.on_commit(
+            lambda: FlightSchedule.materialize(
+                until, schedules=FlightSchedule.objects.filter(pk=schedule.pk)
+            )
+        )
+
+    def perform_create(self, serializer):
+        schedule = serializer.save()
+        self.materialize_on_commit(schedule)
 
-class OrderPagination(PageNumberPagination):
-    page_size = 10
-    max_page_size = 100
+    def perform_update(self, serializer):
+        schedule = serializer.save()
+        schedule.reset_flights()
+        self.materialize_on_commit(schedule)
 
+    def perform_destroy(self, instance):
+        instance.reset_flights()
+        instance.delete()
 
-class OrderViewSet(viewsets.ModelViewSet):
+
+class OrderViewSet(
+    IdempotentCreateMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
-    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    expandable_fields = {
+        "tickets.flight.route": RouteListSerializer,
+        "tickets.flight.airplane": AirplaneListSerializer,
+    }
+    permission_classes = (IsAdminOrIfAuthenticatedReadOrCreate,)
+    # tickets are nested and writable on create only, orders are not edited
+    http_method_names = ["get", "post", "delete", "head", "options"]
 
     def get_queryset(self):
         queryset = self.queryset.filter(user=self.request.user)
 
-        if self.action == "list":
-            queryset = queryset.prefetch_related("tickets__flight__airplane")
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "flight__airplane",
+                        "flight__route__destination",
+                    ),
+                )
+            )
 
         return queryset
 
@@ -234,11 +496,66 @@ class OrderViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "cursor",
+                type=str,
+                description=(
+                    "Switch to keyset pagination ordered by created_at "
+                    "and id, pass an empty value for the first page "
+                    "(ex. ?cursor=)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-class RouteViewSet(viewsets.ModelViewSet):
+    @extend_schema(
+        parameters=[OrderExportSerializer],
+        responses={(200, "application/x-ndjson"): str, (200, "text/csv"): str},
+        description=(
+            "Stream all orders of all users: as NDJSON, one order with its "
+            "tickets per line, or as CSV, one ticket per row."
+        ),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path=r"export/(?P<export_format>ndjson|csv)",
+        permission_classes=[IsAdminUser],
+    )
+    def export(self, request, export_format=None):
+        params = OrderExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        content_type, exporter = EXPORTERS[export_format]
+        response = StreamingHttpResponse(
+            exporter(get_export_queryset(**params.validated_data)),
+            content_type=content_type,
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="orders.{export_format}"'
+        return response
+
+
+class RouteViewSet(
+    CachedResponseMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
+    values_serializer_class = RouteListValuesSerializer
+    expandable_fields = {
+        "source": AirportSerializer,
+        "destination": AirportSerializer,
+    }
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Route, Airport)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -248,3 +565,92 @@ class RouteViewSet(viewsets.ModelViewSet):
             return RouteDetailSerializer
 
         return RouteSerializer
+
+
+class ConnectionViewSet(viewsets.GenericViewSet):
+    serializer_class = ConnectionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(parameters=[ConnectionSearchSerializer])
+    def list(self, request):
+        params = ConnectionSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        # another process may have changed flights since this process
+        # loaded its graph, so reload it once if a leg has disappeared
+        for _ in range(2):
+            flight_ids = connection_graph.search(
+                params["source"],
+                params["destination"],
+                params.get("departure_time") or timezone.now(),
+                criterion=params["criterion"],
+                min_connection=timedelta(minutes=params["min_connection"]),
+                max_connection=timedelta(minutes=params["max_connection"]),
+                max_legs=params["max_legs"],
+            )
+            if not flight_ids:
+                raise NotFound("No connection found.")
+
+            flights = Flight.objects.select_related(
+                "route__source",
+                "route__destination",
+            ).in_bulk(flight_ids)
+            if len(flights) == len(flight_ids):
+                break
+            connection_graph.invalidate()
+        else:
+            raise NotFound("No connection found.")
+
+        legs = [flights[flight_id] for flight_id in flight_ids]
+        connection = {
+            "departure_time": legs[0].departure_time,
+            "arrival_time": legs[-1].arrival_time,
+            "distance": sum(leg.route.distance for leg in legs),
+            "legs": legs,
+        }
+        serializer = self.get_serializer(connection)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SeatHoldViewSet(
+    SparseFieldsetMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+    expandable_fields = {"flight": FlightListSerializer}
+
+    def get_queryset(self):
+        return self.queryset.filter(
+            user=self.request.user,
+            expires_at__gt=timezone.now(),
+        )
+
+    @extend_schema(
+        request=SeatHoldSerializer(many=True),
+        responses=SeatHoldSerializer(many=True),
+        description=(
+            "Hold one seat or a list of seats for the current user until "
+            "expires_at. Holding a seat again extends its hold, and "
+            "ordering a held seat releases it."
+        ),
+    )
+    def create(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(
+            data=request.data if many else [request.data],
+            many=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(
+            serializer.data if many else serializer.data[0],
+            status=status.HTTP_201_CREATED,
+        )
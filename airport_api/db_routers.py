@@ -0,0 +1,141 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+# the replica the current request reads from, None for the primary
+read_database = ContextVar("read_database", default=None)
+
+_DONE = object()
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica picked for the current request, if any,
+    and everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve the reads of GET, HEAD and OPTIONS requests from a random
+    replica in DATABASE_REPLICAS. Unsafe requests read from the
+    primary, so they validate against rows that are up to date and
+    see their own writes. Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        replica = self.pick_replica(request)
+        if replica is None:
+            return self.get_response(request)
+
+        token = read_database.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+        return self.stream_from(replica, response)
+
+    async def __acall__(self, request):
+        replica = self.pick_replica(request)
+        if replica is None:
+            return await self.get_response(request)
+
+        token = read_database.set(replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_database.reset(token)
+        return self.stream_from(replica, response)
+
+    @staticmethod
+    def pick_replica(request):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or request.method not in SAFE_METHODS:
+            return None
+        return random.choice(replicas)
+
+    @staticmethod
+    def stream_from(replica, response):
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = aread_from(
+                    replica, response.streaming_content
+                )
+            else:
+                response.streaming_content = read_from(
+                    replica, response.streaming_content
+                )
+        return response
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Read from the primary inside the block, for data cached under the
+    current model versions, which a lagging replica may predate.
+    """
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+def read_from(database, content):
+    """
+    Iterate ``content`` reading from ``database``, for streaming
+    responses generated after the middleware has returned.
+    """
+    content = iter(content)
+    while True:
+        token = read_database.set(database)
+        try:
+            chunk = next(content, _DONE)
+        finally:
+            read_database.reset(token)
+        if chunk is _DONE:
+            return
+        yield chunk
+
+
+async def aread_from(database, content):
+    """``read_from`` for the async iterators of async streaming responses."""
+    content = content.__aiter__()
+    while True:
+        token = read_database.set(database)
+        try:
+            chunk = await content.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            read_database.reset(token)
+        yield chunk
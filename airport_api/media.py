@@ -0,0 +1,166 @@
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from airport.storage import is_blob
+
+# Directories of MEDIA_ROOT that hold uploads and may be served
+MEDIA_DIRECTORIES = ("images/",)
+
+# Files named by their content never change, so browsers and CDNs may
+# keep them for a year without revalidating
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def media_etag(path, file_stat):
+    """
+    A strong ETag: the content hash of a blob, the modification time
+    and size of any other file.
+    """
+    if is_blob(path):
+        return '"%s"' % posixpath.splitext(posixpath.basename(path))[0]
+    return '"%x-%x"' % (file_stat.st_mtime_ns, file_stat.st_size)
+
+
+def requested_range(request, etag, file_stat):
+    """
+    The ``(start, stop)`` bytes of the Range header, or ``None`` for
+    the whole file: without the header, with several ranges, which may
+    be answered in full, or with an If-Range the file no longer
+    matches.
+    """
+    match = BYTE_RANGE.match(request.headers.get("Range", "").strip())
+    if match is None:
+        return None
+
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        if parse_http_date_safe(if_range) != int(file_stat.st_mtime):
+            return None
+
+    size = file_stat.st_size
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        stop = min(int(last) + 1, size) if last else size
+        if last and int(last) < start:
+            return None
+    elif last:
+        # a suffix: the last bytes
+        start, stop = max(size - int(last), 0), size
+    else:
+        return None
+
+    if start >= stop:
+        raise RangeNotSatisfiable
+    return start, stop
+
+
+def read_range(path, start, stop):
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, full_path, file_stat, etag):
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    )
+
+    if settings.MEDIA_SENDFILE == "x-accel-redirect":
+        # nginx sends the file, answering Range requests itself
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(
+            settings.MEDIA_INTERNAL_URL + path
+        )
+        return response
+    if settings.MEDIA_SENDFILE == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = os.path.abspath(full_path)
+        return response
+
+    try:
+        byte_range = requested_range(request, etag, file_stat)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{file_stat.st_size}"
+        return response
+
+    if byte_range is None:
+        # WSGI servers send a FileResponse with sendfile() if they can
+        return FileResponse(open(full_path, "rb"), content_type=content_type)
+
+    start, stop = byte_range
+    response = StreamingHttpResponse(
+        read_range(full_path, start, stop),
+        status=206,
+        content_type=content_type,
+    )
+    response["Content-Length"] = stop - start
+    response["Content-Range"] = f"bytes {start}-{stop - 1}/{file_stat.st_size}"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve an uploaded file with conditional GET and byte range support,
+    with far-future cache headers when it is a content-addressed blob
+    (see ``airport.storage``). With MEDIA_SENDFILE the web server sends
+    the file instead, so no worker is busy while it is transferred.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    if not path.startswith(MEDIA_DIRECTORIES):
+        raise Http404("Not an uploaded file.")
+
+    full_path = os.path.join(settings.MEDIA_ROOT, path)
+    try:
+        file_stat = os.stat(full_path)
+    except (OSError, ValueError):
+        # ValueError: a null byte in the path
+        raise Http404("No such file.")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("No such file.")
+
+    etag = media_etag(path, file_stat)
+    last_modified = int(file_stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = file_response(request, path, full_path, file_stat, etag)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    if is_blob(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -28,7 +29,12 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "true") == "true"
+
+# The debug toolbar middleware is sync only, so under ASGI it makes
+# Django adapt every middleware and view around it to sync; it is only
+# installed with DEBUG and left out of test runs
+DEBUG_TOOLBAR = DEBUG and sys.argv[1:2] != ["test"]
 
 ALLOWED_HOSTS = []
 
@@ -47,14 +53,15 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "drf_spectacular",
-    "debug_toolbar",
     "airport",
     "user",
 ]
 
 MIDDLEWARE = [
+    "airport.metrics.RequestMetricsMiddleware",
+    "airport.query_inspection.QueryInspectionMiddleware",
+    "airport_api.db_routers.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -63,6 +70,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "airport_api.urls"
 
 TEMPLATES = [
@@ -87,13 +101,123 @@ WSGI_APPLICATION = "airport_api.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
+if os.getenv("POSTGRES_DB"):
+    POSTGRES = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv("POSTGRES_DB"),
+        "USER": os.getenv("POSTGRES_USER", "postgres"),
+        "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+        "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+        "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        # reuse connections across requests, checking them before reuse
+        "CONN_MAX_AGE": int(os.getenv("POSTGRES_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        # a pooler in transaction mode, like PgBouncer, can hand every
+        # transaction a different server connection, which breaks
+        # server-side cursors
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("POSTGRES_POOLER")
+        == "pgbouncer",
+        "OPTIONS": {
+            "connect_timeout": int(os.getenv("POSTGRES_CONNECT_TIMEOUT", "5"))
+        },
+    }
+    DATABASES = {"default": POSTGRES}
+    replica_hosts = os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")
+    for index, host in enumerate(filter(None, map(str.strip, replica_hosts))):
+        DATABASES[f"replica_{index}"] = {
+            **POSTGRES,
+            "HOST": host,
+            "TEST": {"MIRROR": "default"},
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
+    }
+
+# Reads of safe requests go to a random replica (see airport_api.db_routers)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["airport_api.db_routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
+# Reference data responses (airports, airplane types, facilities, routes)
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Order creations replayed for retries with the same Idempotency-Key;
+# use a cache shared by all processes, e.g. Redis or Memcached
+IDEMPOTENCY_CACHE_ALIAS = "default"
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# How long a key stays claimed by a request that never finished
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# How long a seat stays reserved for a customer before checkout
+SEAT_HOLD_TTL = timedelta(minutes=10)
+
+# How many seats a customer can hold at once, and how long holding a
+# seat again can keep it reserved in total
+SEAT_HOLD_MAX_PER_USER = int(os.getenv("SEAT_HOLD_MAX_PER_USER", "10"))
+SEAT_HOLD_MAX_AGE = timedelta(
+    minutes=int(os.getenv("SEAT_HOLD_MAX_AGE_MINUTES", "30"))
+)
+
+# How far ahead flight schedules are materialized into flights
+FLIGHT_SCHEDULE_HORIZON = timedelta(days=90)
+
+# Build flight, route and airplane list responses from values() rows
+# instead of DRF serializers, with the same JSON
+VALUES_LIST_SERIALIZERS = True
+
+# Share of requests whose latency, query count and database time are
+# recorded, served at /metrics/ in the Prometheus text format
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.getenv("REQUEST_METRICS_SAMPLE_RATE", "1.0")
+)
+
+# Comma-separated addresses that may read /metrics/ besides staff users,
+# e.g. the Prometheus server. Empty by default: behind a reverse proxy on
+# the same host every request comes from 127.0.0.1
+METRICS_ALLOWED_IPS = list(
+    filter(
+        None, map(str.strip, os.getenv("METRICS_ALLOWED_IPS", "").split(","))
+    )
+)
+
+# Report queries repeated within a request (N+1 patterns) and slow ones:
+# "off", "warn" to log them or "raise" to fail the request, e.g. with
+# QUERY_INSPECTION=raise python manage.py test
+QUERY_INSPECTION = os.getenv("QUERY_INSPECTION", "off")
+QUERY_INSPECTION_REPEAT_THRESHOLD = 3
+QUERY_INSPECTION_SLOW_THRESHOLD = 0.5
+
+# Stream uploaded files to a temporary file on disk instead of memory
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Resized copies of uploaded airport and airplane type images, saved as
+# WebP and JPEG within these (width, height) boxes by IMAGE_WORKERS
+# background threads, or inline with 0 workers
+IMAGE_VARIANTS = {
+    "thumbnail": (160, 160),
+    "medium": (640, 640),
+}
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -132,8 +256,21 @@ AUTH_USER_MODEL = "user.User"
 
 STATIC_URL = "static/"
 
+# Where collectstatic gathers static files for the web server to serve
+STATIC_ROOT = os.getenv("STATIC_ROOT", BASE_DIR / "staticfiles")
+
 MEDIA_URL = "/media/"
 
+# Uploads are stored under images/ of this directory
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", BASE_DIR)
+
+# How uploads are handed to the client: "" streams them from Django
+# (with sendfile() where the WSGI server supports it), "x-accel-redirect"
+# lets nginx send them from the internal location MEDIA_INTERNAL_URL and
+# "x-sendfile" lets Apache (mod_xsendfile) send them by path
+MEDIA_SENDFILE = os.getenv("MEDIA_SENDFILE", "")
+MEDIA_INTERNAL_URL = os.getenv("MEDIA_INTERNAL_URL", "/internal-media/")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -144,6 +281,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # orjson backed, swap for rest_framework.renderers.JSONRenderer and
+    # rest_framework.parsers.JSONParser to use the standard library
+    "DEFAULT_RENDERER_CLASSES": (
+        "airport.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "airport.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 SPECTACULAR_SETTINGS = {